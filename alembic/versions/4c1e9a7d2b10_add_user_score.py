@@ -0,0 +1,36 @@
+"""add user score
+
+Revision ID: 4c1e9a7d2b10
+Revises: 35d3ab8bbf0f
+Create Date: 2026-10-18 09:12:44.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e9a7d2b10'
+down_revision: Union[str, Sequence[str], None] = '35d3ab8bbf0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('score', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+    op.create_index(op.f('ix_users_updated_at'), 'users', ['updated_at'], unique=False)
+    op.create_index('ix_users_score_desc_id', 'users', [sa.text('score DESC'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_score_desc_id', table_name='users')
+    op.drop_index(op.f('ix_users_updated_at'), table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('score')
@@ -0,0 +1,37 @@
+"""refresh token expiry indexes
+
+Revision ID: 7b2f5e8c9d41
+Revises: 4c1e9a7d2b10
+Create Date: 2026-10-18 10:03:27.554901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2f5e8c9d41'
+down_revision: Union[str, Sequence[str], None] = '4c1e9a7d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('revoked_at', sa.DateTime(), nullable=True))
+    # Tokens revoked before this migration start their retention period now
+    op.execute("UPDATE refresh_tokens SET revoked_at = CURRENT_TIMESTAMP WHERE revoked = 1 AND revoked_at IS NULL")
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_revoked_at'), 'refresh_tokens', ['revoked_at'], unique=False)
+    op.create_index('ix_refresh_tokens_user_id_revoked', 'refresh_tokens', ['user_id', 'revoked'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_tokens_user_id_revoked', table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_revoked_at'), table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_column('revoked_at')
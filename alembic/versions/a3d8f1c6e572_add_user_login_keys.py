@@ -0,0 +1,78 @@
+"""add user login keys
+
+Revision ID: a3d8f1c6e572
+Revises: 7b2f5e8c9d41
+Create Date: 2026-10-18 13:02:18.640115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8f1c6e572'
+down_revision: Union[str, Sequence[str], None] = '7b2f5e8c9d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('email_key', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('username_key', sa.String(), nullable=True))
+
+    # Backfill in Python (str.lower, same as the application) in id-ordered batches
+    connection = op.get_bind()
+    users = sa.table(
+        'users', sa.column('id'), sa.column('email'), sa.column('username'),
+        sa.column('email_key'), sa.column('username_key'),
+    )
+    update = (
+        sa.update(users)
+        .where(users.c.id == sa.bindparam('user_id'))
+        .values(email_key=sa.bindparam('new_email_key'), username_key=sa.bindparam('new_username_key'))
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(users.c.id, users.c.email, users.c.username)
+            .where(users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            {
+                'user_id': row.id,
+                'new_email_key': row.email.lower() if row.email is not None else None,
+                'new_username_key': row.username.lower() if row.username is not None else None,
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+    # Accounts differing only in letter case cannot both keep their login; stop with a clear message
+    for column in ('email_key', 'username_key'):
+        duplicates = connection.execute(
+            sa.select(users.c[column]).where(users.c[column].is_not(None))
+            .group_by(users.c[column]).having(sa.func.count() > 1).limit(10)
+        ).scalars().all()
+        if duplicates:
+            raise RuntimeError(f"Users differ only by case in {column}, resolve before upgrading: {duplicates}")
+
+    op.create_index(op.f('ix_users_email_key'), 'users', ['email_key'], unique=True)
+    op.create_index(op.f('ix_users_username_key'), 'users', ['username_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_username_key'), table_name='users')
+    op.drop_index(op.f('ix_users_email_key'), table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('username_key')
+        batch_op.drop_column('email_key')
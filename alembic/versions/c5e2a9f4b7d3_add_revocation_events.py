@@ -0,0 +1,39 @@
+"""add revocation events
+
+Revision ID: c5e2a9f4b7d3
+Revises: a3d8f1c6e572
+Create Date: 2026-10-18 14:12:40.218337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2a9f4b7d3'
+down_revision: Union[str, Sequence[str], None] = 'a3d8f1c6e572'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'revocation_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('jti', sa.String(), nullable=True),
+        sa.Column('issued_before', sa.Float(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_revocation_events_expires_at'), 'revocation_events', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_revocation_events_expires_at'), table_name='revocation_events')
+    op.drop_table('revocation_events')
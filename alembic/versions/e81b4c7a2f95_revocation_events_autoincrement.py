@@ -0,0 +1,32 @@
+"""revocation events autoincrement
+
+Revision ID: e81b4c7a2f95
+Revises: c5e2a9f4b7d3
+Create Date: 2026-10-19 09:41:07.552918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b4c7a2f95'
+down_revision: Union[str, Sequence[str], None] = 'c5e2a9f4b7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite can only add AUTOINCREMENT by rebuilding the table (rows and ids are copied over)
+    with op.batch_alter_table('revocation_events', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('revocation_events', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
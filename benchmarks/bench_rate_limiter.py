@@ -0,0 +1,81 @@
+"""
+Per-check overhead of the rate limiter storages, plus a cross-process sharing check.
+
+For each storage URI the script times `hit()` calls of the sliding-window-counter strategy
+(the one configured in src/limiter.py). It then starts several processes that hammer one key
+with a limit of --shared-limit: a shared storage admits exactly that many hits in total, while
+per-process memory storage admits that many per process.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py --checks 20000 --processes 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _strategy(uri: str):
+    sys.path.insert(0, ROOT)
+    import src.limiter_storage  # noqa: F401
+    from limits.storage import storage_from_string
+    from limits.strategies import SlidingWindowCounterRateLimiter
+
+    return SlidingWindowCounterRateLimiter(storage_from_string(uri))
+
+
+def measure_overhead(uri: str, checks: int, keys: int) -> dict:
+    from limits import parse
+
+    strategy = _strategy(uri)
+    item = parse("1000000/minute")
+    strategy.hit(item, "warmup")
+    started = time.perf_counter()
+    for i in range(checks):
+        strategy.hit(item, f"ip:10.0.{i % keys // 256}.{i % 256}", "/auth/login")
+    elapsed = time.perf_counter() - started
+    return {"storage": uri.split(":")[0], "checks": checks, "microseconds_per_check": round(elapsed / checks * 1e6, 2)}
+
+
+def _hammer(uri: str, limit: int, attempts: int, results):
+    from limits import parse
+
+    strategy = _strategy(uri)
+    item = parse(f"{limit}/minute")
+    results.put(sum(1 for _ in range(attempts) if strategy.hit(item, "shared-key")))
+
+
+def measure_sharing(uri: str, processes: int, limit: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_hammer, args=(uri, limit, limit * 2, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    admitted = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return {"storage": uri.split(":")[0], "processes": processes, "limit": limit, "admitted_total": admitted}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--keys", type=int, default=1000, help="distinct client keys to rotate through")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--shared-limit", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-ratelimit-")
+    for uri in ("memory://", f"sqlite:///{os.path.join(workdir, 'overhead.db')}"):
+        print(json.dumps(measure_overhead(uri, args.checks, args.keys)))
+    for uri in ("memory://", f"sqlite:///{os.path.join(workdir, 'shared.db')}"):
+        print(json.dumps(measure_sharing(uri, args.processes, args.shared_limit)))
+
+
+if __name__ == "__main__":
+    main()
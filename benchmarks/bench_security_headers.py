@@ -0,0 +1,95 @@
+"""
+Per-request overhead of the security headers middleware on /agent and /hello.
+
+Builds three apps around the real home_controller router: no middleware, the previous
+BaseHTTPMiddleware implementation (reproduced below as the baseline) and the current
+pure ASGI SecurityHeadersMiddleware. Requests are driven straight through the ASGI
+interface, so the numbers contain no HTTP client or socket overhead. /hello runs with
+get_current_user overridden to a fixed user.
+
+Usage:
+    python benchmarks/bench_security_headers.py --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from src.controllers import home_controller  # noqa: E402
+from src.middleware.security_headers import SecurityHeadersMiddleware  # noqa: E402
+from src.security import get_current_user  # noqa: E402
+from src.token_cache import UserSnapshot  # noqa: E402
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware version this middleware replaced."""
+
+    async def dispatch(self, request: Request, call_next):
+        response: Response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline'; img-src 'self' data:;"
+        response.headers["Referrer-Policy"] = "no-referrer"
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    if middleware is not None:
+        app.add_middleware(middleware)
+    app.include_router(home_controller.router)
+    app.dependency_overrides[get_current_user] = lambda: UserSnapshot(id=1, username="bench", email="bench@example.com")
+    return app
+
+
+async def drive(app, path: str, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench"), (b"authorization", b"Bearer x")],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):  # warm up
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    variants = {"none": None, "base_http_middleware": LegacySecurityHeadersMiddleware, "pure_asgi": SecurityHeadersMiddleware}
+    for path in ("/agent", "/hello"):
+        timings = {name: asyncio.run(drive(build_app(mw), path, args.requests)) for name, mw in variants.items()}
+        print(json.dumps({
+            "path": path,
+            "microseconds_per_request": {name: round(value, 1) for name, value in timings.items()},
+            "middleware_overhead_us": {
+                "base_http_middleware": round(timings["base_http_middleware"] - timings["none"], 1),
+                "pure_asgi": round(timings["pure_asgi"] - timings["none"], 1),
+            },
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Leaderboard serialization cost at 100k rows.
+
+Two measurements, medians over `--runs`:
+
+    encode    `--users` leaderboard entries rendered to a JSON body, by FastAPI's default path
+              for a handler returning plain data (jsonable_encoder + JSONResponse.render) and by
+              the app's FastJSONResponse (src/responses.py; orjson when installed, else pydantic-core)
+    endpoint  GET /leaderboard (largest page) and GET /leaderboard/stream (the whole ranking) through
+              ASGI against a temporary SQLite database seeded with `--users` accounts. The response
+              cache is disabled, so every request queries and serializes.
+
+Usage:
+    python benchmarks/bench_serialization.py --users 100000 --runs 5
+
+Results are printed as JSON lines: one per encoder, then one per endpoint.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_CHUNK = 10_000
+
+
+def _configure(workdir: str):
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    defaults = {
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "RATE_LIMIT_STORAGE_URI": f"sqlite:///{os.path.join(workdir, 'ratelimit.db')}",
+        "LOG_FILE": os.path.join(workdir, "logs", "app.log"),
+        "LOG_LEVEL": "WARNING",
+        "RESPONSE_CACHE_ENABLED": "false",
+        # /leaderboard/stream is limited to 10/minute
+        "RATELIMIT_ENABLED": "false",
+        "REFRESH_TOKEN_REAPER_ENABLED": "false",
+        "BCRYPT_ROUNDS": "12",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def _median_ms(function, runs: int) -> tuple[float, object]:
+    timings, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 1), result
+
+
+# --- encode ---
+def bench_encode(users: int, runs: int) -> list[dict]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from src.responses import JSON_ENCODER, FastJSONResponse
+    from src.services.leaderboard_service import LeaderboardService
+
+    rng = random.Random(42)
+    rows = [SimpleNamespace(id=i, username=f"bench{i}", score=rng.randint(0, 100_000)) for i in range(users)]
+    entries = [LeaderboardService._to_entry(row, rank) for rank, row in enumerate(rows, start=1)]
+    encoders = {
+        "jsonable_encoder+json": lambda: JSONResponse(jsonable_encoder(entries)).body,
+        f"FastJSONResponse ({JSON_ENCODER})": lambda: FastJSONResponse(entries).body,
+    }
+    results = []
+    for name, encode in encoders.items():
+        median_ms, body = _median_ms(encode, runs)
+        results.append({"encode": name, "rows": users, "median_ms": median_ms, "bytes": len(body)})
+    return results
+
+
+# --- endpoint ---
+def _seed(user_count: int):
+    from src.database import Base, engine
+    from src.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    insert = User.__table__.insert()
+    with engine.begin() as connection:
+        for start in range(0, user_count, SEED_CHUNK):
+            connection.execute(insert, [
+                {"username": f"bench{i}", "email": f"bench{i}@example.com", "password": "x",
+                 "role": "USER", "score": rng.randint(0, 100_000)}
+                for i in range(start, min(start + SEED_CHUNK, user_count))
+            ])
+
+
+async def _endpoints(runs: int) -> list[dict]:
+    import httpx
+    import main
+
+    paths = ["/leaderboard?limit=500", "/leaderboard/stream"]
+    results = []
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+            for path in paths:
+                (await client.get(path)).raise_for_status()  # warm-up (route, statements, page cache)
+                timings, size = [], 0
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    response = await client.get(path)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    response.raise_for_status()
+                    size = len(response.content)
+                results.append({"endpoint": path, "median_ms": round(statistics.median(timings), 1),
+                                "min_ms": round(min(timings), 1), "bytes": size})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-serialization-") as workdir:
+        _configure(workdir)
+        for result in bench_encode(args.users, args.runs):
+            print(json.dumps(result))
+        _seed(args.users)
+        for result in asyncio.run(_endpoints(args.runs)):
+            print(json.dumps(result))
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
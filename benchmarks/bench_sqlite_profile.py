@@ -0,0 +1,127 @@
+"""
+Login throughput with and without the SQLite performance profile.
+
+Every /auth/login commits a RefreshToken row, so concurrent logins from several
+processes are a good proxy for write contention on the SQLite file. Users are
+seeded with cheap bcrypt hashes (4 rounds) so the numbers reflect the database,
+not password hashing.
+
+Usage:
+    python benchmarks/bench_sqlite_profile.py --processes 4 --concurrency 16 --requests 400
+
+Each profile gets a fresh database; results are printed as one JSON line per profile.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchmark-password"
+
+
+def _seed(user_count: int):
+    sys.path.insert(0, ROOT)
+    from passlib.hash import bcrypt
+    from src.database import Base, SessionLocal, engine
+    from src.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    hashed = bcrypt.using(rounds=4).hash(PASSWORD)
+    db = SessionLocal()
+    db.add_all(User(username=f"bench{i}", email=f"bench{i}@example.com", password=hashed) for i in range(user_count))
+    db.commit()
+    db.close()
+
+
+async def _login_burst(user_ids, concurrency: int):
+    import httpx
+    import main
+
+    main.app.state.limiter.enabled = False
+    semaphore = asyncio.Semaphore(concurrency)
+    outcome = {"ok": 0, "errors": 0}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        async def login(user_id):
+            async with semaphore:
+                try:
+                    response = await client.post(
+                        "/auth/login", data={"username": f"bench{user_id}", "password": PASSWORD}
+                    )
+                    outcome["ok" if response.status_code == 200 else "errors"] += 1
+                except Exception:
+                    outcome["errors"] += 1
+
+        await asyncio.gather(*(login(user_id) for user_id in user_ids))
+    return outcome
+
+
+def _worker(user_ids, concurrency: int, start_event, results):
+    sys.path.insert(0, ROOT)
+    os.chdir(os.environ["BENCH_WORKDIR"])
+    import main  # noqa: F401  (import before the clock starts)
+
+    start_event.wait()
+    results.put(asyncio.run(_login_burst(user_ids, concurrency)))
+
+
+def run_profile(profile: str, processes: int, concurrency: int, requests: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"bench-sqlite-{profile}-")
+    os.environ.update({
+        "BENCH_WORKDIR": workdir,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "SQLITE_PROFILE": profile,
+        "PASSWORD_HASH_WORKERS": "0",
+    })
+    ctx = multiprocessing.get_context("spawn")
+
+    seeder = ctx.Process(target=_seed, args=(requests,))
+    seeder.start()
+    seeder.join()
+
+    start_event, results = ctx.Event(), ctx.Queue()
+    chunks = [list(range(i, requests, processes)) for i in range(processes)]
+    workers = [ctx.Process(target=_worker, args=(chunk, concurrency, start_event, results)) for chunk in chunks]
+    for worker in workers:
+        worker.start()
+    time.sleep(2)  # let every worker finish importing the app
+
+    started = time.perf_counter()
+    start_event.set()
+    outcomes = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+
+    ok = sum(outcome["ok"] for outcome in outcomes)
+    return {
+        "profile": profile,
+        "processes": processes,
+        "concurrency_per_process": concurrency,
+        "requests": requests,
+        "ok": ok,
+        "errors": sum(outcome["errors"] for outcome in outcomes),
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(ok / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--profiles", default="default,performance")
+    args = parser.parse_args()
+
+    for profile in args.profiles.split(","):
+        print(json.dumps(run_profile(profile, args.processes, args.concurrency, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
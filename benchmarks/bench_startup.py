@@ -0,0 +1,128 @@
+"""
+Cold-start time of one app process: what a new worker costs before it serves its first request.
+
+Each run is a fresh interpreter (`python -X importtime`) in a temporary directory that measures:
+
+    import          `import main` (modules, settings, engines, routers)
+    startup         the lifespan startup (create_all, hashing policy, logging, reaper)
+    first_request   GET /agent through httpx's ASGI transport (route compilation, first DB-free response)
+
+Medians over `--runs` are printed, with the packages that spend the most import time (summed
+`-X importtime` self time, so nested imports are not counted twice). BCRYPT_ROUNDS is fixed, as
+under the production launcher, so calibration is not part of a worker's start.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --budget-ms 800   # exits 1 when the median total exceeds it
+
+Results are printed as JSON lines: one per phase summary, then one per package.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ["import", "startup", "first_request", "total"]
+
+# Runs inside the measured interpreter; prints one JSON line of phase timings (ms)
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+
+async def serve():
+    import httpx
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get("/agent")
+        response.raise_for_status()
+        return ready, time.perf_counter()
+
+ready, answered = asyncio.run(serve())
+print(json.dumps({{
+    "import": (imported - started) * 1000,
+    "startup": (ready - imported) * 1000,
+    "first_request": (answered - ready) * 1000,
+    "total": (answered - started) * 1000,
+}}))
+"""
+
+
+def _environment(workdir: str) -> dict:
+    env = dict(os.environ)
+    defaults = {
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        "RATE_LIMIT_STORAGE_URI": f"sqlite:///{os.path.join(workdir, 'ratelimit.db')}",
+        "LOG_FILE": os.path.join(workdir, "logs", "app.log"),
+        "LOG_LEVEL": "WARNING",
+        "REFRESH_TOKEN_REAPER_ENABLED": "false",
+        "BCRYPT_ROUNDS": "12",
+    }
+    for key, value in defaults.items():
+        env.setdefault(key, value)
+    return env
+
+
+def _parse_importtime(stderr: str) -> dict[str, int]:
+    """Self time (us) per top-level package from `-X importtime` lines."""
+    packages: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages
+
+
+def measure_once() -> tuple[dict, dict[str, int]]:
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as workdir:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE.format(root=ROOT)],
+            cwd=workdir, env=_environment(workdir), capture_output=True, text=True,
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"startup probe failed:\n{completed.stderr[-4000:]}")
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return timings, _parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="packages listed by import time")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="maximum median total (0 disables)")
+    args = parser.parse_args()
+
+    runs, packages = [], []
+    for _ in range(args.runs):
+        timings, imported = measure_once()
+        runs.append(timings)
+        packages.append(imported)
+
+    medians = {phase: round(statistics.median(run[phase] for run in runs), 1) for phase in PHASES}
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        print(json.dumps({"phase": phase, "median_ms": medians[phase],
+                          "min_ms": round(min(values), 1), "max_ms": round(max(values), 1)}))
+
+    names = {name for imported in packages for name in imported}
+    by_package = {name: statistics.median(imported.get(name, 0) for imported in packages) for name in names}
+    for name, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(json.dumps({"package": name, "import_ms": round(self_us / 1000, 1)}))
+
+    if args.budget_ms and medians["total"] > args.budget_ms:
+        print(f"Startup budget exceeded: {medians['total']} ms > {args.budget_ms:g} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
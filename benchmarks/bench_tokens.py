@@ -0,0 +1,88 @@
+"""
+Access-token encodes and decodes per second: the original python-jose path vs src/tokens.py.
+
+Compared paths:
+    jose-direct HS256   jwt.encode/jwt.decode with SECRET_KEY, as security.py did before
+    jose HS256/ES256    TokenCodec with the python-jose backend (kid header, keyring lookup)
+    native HS256/ES256/EdDSA  TokenCodec with the native backend (precomputed keys)
+
+Usage:
+    python benchmarks/bench_tokens.py --iterations 20000
+
+Results are printed as one JSON line per path.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET = "benchmark-secret-key"
+
+
+def _rate(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - started)
+
+
+def _pem(private_key) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    from jose import jwt
+    from src.tokens import JoseBackend, Key, Keyring, NativeBackend, TokenCodec
+
+    claims = {"sub": "bench@example.com", "exp": int(time.time()) + 3600}
+    keys = {
+        "HS256": Key("hs", "HS256", secret=SECRET),
+        "ES256": Key("es", "ES256", private_key_pem=_pem(ec.generate_private_key(ec.SECP256R1()))),
+        "EdDSA": Key("ed", "EdDSA", private_key_pem=_pem(ed25519.Ed25519PrivateKey.generate())),
+    }
+
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+    paths = [(
+        "jose-direct", "HS256",
+        lambda: jwt.encode(claims, SECRET, algorithm="HS256"),
+        lambda: jwt.decode(token, SECRET, algorithms=["HS256"]),
+    )]
+    for backend_name, backend, algorithms in (
+        ("jose", JoseBackend(), ("HS256", "ES256")),  # python-jose has no EdDSA
+        ("native", NativeBackend(), ("HS256", "ES256", "EdDSA")),
+    ):
+        for alg in algorithms:
+            codec = TokenCodec(Keyring([keys[alg]]), backend)
+            encoded = codec.encode(claims)
+            paths.append((
+                backend_name, alg,
+                lambda codec=codec: codec.encode(claims),
+                lambda codec=codec, encoded=encoded: codec.decode(encoded),
+            ))
+
+    for backend_name, alg, encode, decode in paths:
+        # Asymmetric signing is far slower; scale down so every path takes similar wall time
+        iterations = args.iterations if alg.startswith("HS") else max(args.iterations // 10, 1)
+        print(json.dumps({
+            "backend": backend_name,
+            "algorithm": alg,
+            "iterations": iterations,
+            "encodes_per_second": round(_rate(encode, iterations)),
+            "decodes_per_second": round(_rate(decode, iterations)),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""
+Reproducible benchmark harness for the auth and leaderboard endpoints.
+
+Each run seeds a temporary SQLite database with `--users` accounts (cheap 4-round bcrypt
+hashes, random scores), then drives these scenarios with `--concurrency` requests in flight:
+
+    register     POST /auth/register   (hashes a new password at the app's real cost)
+    login        POST /auth/login
+    refresh      POST /auth/refresh    (one freshly issued refresh token per request)
+    me           GET  /auth/me
+    hello        GET  /hello
+    agent        GET  /agent               (no database work at all)
+    leaderboard  GET  /leaderboard?offset=<random>&limit=100
+
+Two transports are supported: `asgi` calls `main.app` in-process (no network, and DB queries
+are counted through SQLAlchemy engine events), and `uvicorn` starts a local server on a free
+port. Every mode runs in its own process against its own database, so peak RSS is not skewed
+by a previous run.
+
+In `asgi` mode, the statements and pool checkouts that requests cause are checked against
+QUERY_BUDGETS / CHECKOUT_BUDGETS (average per request; background polls are not counted). The
+harness exits 1 when a scenario goes over budget, so a change that adds a query to a hot path,
+or makes a DB-free route touch the pool, fails the run.
+
+Usage:
+    python benchmarks/harness.py --users 1000 --requests 500 --concurrency 16
+    python benchmarks/harness.py --users 1000000 --mode uvicorn --scenarios me,leaderboard
+    python benchmarks/harness.py --compare benchmarks/results/<old>.json
+
+Results (p50/p95/p99 latency in ms, requests per second, DB queries per request, peak RSS)
+are printed and written to `--output` (default: benchmarks/results/<commit>.json).
+With `--compare OLD.json`, the per-scenario change against a previous run is printed too.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+PASSWORD = "benchmark-password"
+SCENARIOS = ["register", "login", "refresh", "me", "hello", "agent", "leaderboard"]
+# Most statements / connection checkouts a request may cause, on average. me/hello verify each
+# pooled token once (then the token and response caches answer); login and refresh also commit
+# a refresh token through RefreshTokenStore's own (batched) session.
+QUERY_BUDGETS = {"register": 1, "login": 2, "refresh": 3, "me": 1, "hello": 1, "agent": 0, "leaderboard": 2}
+CHECKOUT_BUDGETS = {"register": 1, "login": 2, "refresh": 2, "me": 1, "hello": 1, "agent": 0, "leaderboard": 1}
+# Password-hashing scenarios are CPU-bound at the app's real bcrypt cost; keep them short
+HASHING_SCENARIOS = {"register"}
+SEED_CHUNK = 10_000
+TOKEN_POOL = 64
+
+
+# --- Helpers ---
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def _peak_rss_mb(pid: int | None = None) -> float | None:
+    """High-water mark of the resident set (VmHWM), falling back to getrusage for this process."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if pid is None:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class QueryCounter:
+    """
+    Counts statements and pool checkouts caused by requests, on every engine the app uses.
+
+    Only work done under a request id (set by RequestIdMiddleware, inherited by tasks a request
+    starts) is counted, so background loops such as the revocation poll do not blur the figures.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.checkouts = 0
+
+    def _on_execute(self, *args):
+        if self._request_id.get() is not None:
+            self.count += 1
+
+    def _on_checkout(self, *args):
+        if self._request_id.get() is not None:
+            self.checkouts += 1
+
+    def attach(self):
+        from sqlalchemy import event
+        from src.database import async_engine, async_write_engine, engine
+        from src.logging_config import request_id_var
+
+        self._request_id = request_id_var
+        engines = {id(e): e for e in (engine, async_engine.sync_engine, async_write_engine.sync_engine)}
+        for bound in engines.values():
+            event.listen(bound, "before_cursor_execute", self._on_execute)
+            event.listen(bound.pool, "checkout", self._on_checkout)
+
+
+# --- Seeding ---
+def _seed(user_count: int) -> float:
+    from passlib.hash import bcrypt
+    from src.database import Base, engine
+    from src.models.user import User
+
+    started = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    hashed = bcrypt.using(rounds=4).hash(PASSWORD)
+    rng = random.Random(42)
+    insert = User.__table__.insert()
+    with engine.begin() as connection:
+        for start in range(0, user_count, SEED_CHUNK):
+            connection.execute(insert, [
+                {"username": f"bench{i}", "email": f"bench{i}@example.com", "password": hashed,
+                 "role": "USER", "score": rng.randint(0, 100_000)}
+                for i in range(start, min(start + SEED_CHUNK, user_count))
+            ])
+    return time.perf_counter() - started
+
+
+# --- Scenario driver ---
+async def _login(client, user_index: int):
+    return await client.post("/auth/login", data={"username": f"bench{user_index}", "password": PASSWORD})
+
+
+async def _prepare(client, scenario: str, requests: int, users: int, rng: random.Random) -> list:
+    """Builds one argument per request; setup traffic happens here, outside the timed section."""
+    if scenario == "register":
+        run_id = os.urandom(4).hex()
+        return [f"{run_id}n{i}" for i in range(requests)]
+    if scenario == "login":
+        return [rng.randrange(users) for _ in range(requests)]
+    if scenario == "refresh":
+        cookies = []
+        for i in range(requests):
+            response = await _login(client, i % users)
+            cookies.append(response.cookies["refresh_token"])
+        return cookies
+    if scenario == "agent":
+        return [None] * requests
+    if scenario in ("me", "hello"):
+        tokens = []
+        for i in range(min(TOKEN_POOL, users)):
+            tokens.append((await _login(client, i)).json()["access_token"])
+        return [tokens[i % len(tokens)] for i in range(requests)]
+    if scenario == "leaderboard":
+        return [rng.randrange(max(1, users - 100)) for _ in range(requests)]
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def _request(client, scenario: str, arg):
+    if scenario == "register":
+        return client.post("/auth/register", json={
+            "username": f"user{arg}", "email": f"{arg}@example.com", "password": PASSWORD,
+        })
+    if scenario == "login":
+        return _login(client, arg)
+    if scenario == "refresh":
+        return client.post("/auth/refresh", headers={"Cookie": f"refresh_token={arg}"})
+    if scenario == "me":
+        return client.get("/auth/me", headers={"Authorization": f"Bearer {arg}"})
+    if scenario == "hello":
+        return client.get("/hello", headers={"Authorization": f"Bearer {arg}"})
+    if scenario == "agent":
+        return client.get("/agent")
+    return client.get("/leaderboard", params={"offset": arg, "limit": 100})
+
+
+async def _run_scenario(client, scenario: str, requests: int, concurrency: int, users: int,
+                        counter: QueryCounter | None, server_pid: int | None) -> dict:
+    args = await _prepare(client, scenario, requests, users, random.Random(7))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(arg):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await _request(client, scenario, arg)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    queries_before = counter.count if counter else 0
+    checkouts_before = counter.checkouts if counter else 0
+    started = time.perf_counter()
+    await asyncio.gather(*(one(arg) for arg in args))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "requests": len(args),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(args) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "queries_per_request": round((counter.count - queries_before) / len(args), 2) if counter else None,
+        "checkouts_per_request": round((counter.checkouts - checkouts_before) / len(args), 2) if counter else None,
+        "peak_rss_mb": _peak_rss_mb(server_pid),
+    }
+
+
+async def _drive(client, options: dict, counter: QueryCounter | None, server_pid: int | None) -> list[dict]:
+    results = []
+    for scenario in options["scenarios"]:
+        requests = options["hash_requests"] if scenario in HASHING_SCENARIOS else options["requests"]
+        results.append(await _run_scenario(
+            client, scenario, requests, options["concurrency"], options["users"], counter, server_pid
+        ))
+    return results
+
+
+# --- Modes (each runs in its own spawned process) ---
+def _configure(workdir: str):
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    defaults = {
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "RATE_LIMIT_STORAGE_URI": f"sqlite:///{os.path.join(workdir, 'ratelimit.db')}",
+        "LOG_FILE": os.path.join(workdir, "logs", "app.log"),
+        "LOG_LEVEL": "WARNING",
+        # The login limit (5/minute) would turn the scenarios into a 429 benchmark
+        "RATELIMIT_ENABLED": "false",
+        "REFRESH_TOKEN_REAPER_ENABLED": "false",
+        # Seeded users have cheap rounds-4 hashes; keep them (and the register cost) fixed across runs
+        "PASSWORD_REHASH_ON_LOGIN": "false",
+        "BCRYPT_ROUNDS": "12",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+async def _run_asgi(options: dict) -> list[dict]:
+    import httpx
+    import main
+
+    counter = QueryCounter()
+    counter.attach()
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await _drive(client, options, counter, None)
+
+
+async def _run_uvicorn(options: dict, workdir: str) -> list[dict]:
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", ROOT,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=workdir,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            for _ in range(300):
+                try:
+                    await client.get("/agent")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            return await _drive(client, options, None, server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _mode_worker(mode: str, options: dict, results):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{mode}-")
+    _configure(workdir)
+    seed_seconds = _seed(options["users"])
+    if mode == "asgi":
+        scenarios = asyncio.run(_run_asgi(options))
+    else:
+        scenarios = asyncio.run(_run_uvicorn(options, workdir))
+    results.put({"mode": mode, "seed_seconds": round(seed_seconds, 2), "scenarios": scenarios})
+
+
+def run(options: dict) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    runs = []
+    for mode in options["modes"]:
+        results = ctx.Queue()
+        worker = ctx.Process(target=_mode_worker, args=(mode, options, results))
+        worker.start()
+        runs.append(results.get())
+        worker.join()
+    return {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": options,
+        "runs": runs,
+    }
+
+
+def over_budget(report: dict) -> list[str]:
+    """Scenarios whose DB queries or pool checkouts per request exceed their budget (asgi runs only)."""
+    failures = []
+    for mode_run in report["runs"]:
+        for scenario in mode_run["scenarios"]:
+            for metric, budgets in (("queries_per_request", QUERY_BUDGETS), ("checkouts_per_request", CHECKOUT_BUDGETS)):
+                value, budget = scenario.get(metric), budgets[scenario["scenario"]]
+                if value is not None and value > budget:
+                    failures.append(f"{mode_run['mode']} {scenario['scenario']}: {metric} {value} > {budget}")
+    return failures
+
+
+def compare(current: dict, previous: dict) -> list[str]:
+    """Per scenario: relative change of p50/p99 latency and throughput against a previous run."""
+    def index(report):
+        return {(r["mode"], s["scenario"]): s for r in report["runs"] for s in r["scenarios"]}
+
+    old = index(previous)
+    lines = []
+    for key, new in index(current).items():
+        if key not in old:
+            continue
+        parts = []
+        for metric in ("p50_ms", "p99_ms", "rps"):
+            before, after = old[key].get(metric), new.get(metric)
+            if before and after is not None:
+                parts.append(f"{metric} {(after - before) / before:+.1%}")
+        lines.append(f"{key[0]:8} {key[1]:12} " + "  ".join(parts))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000, help="seeded accounts (1k to 1M)")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--hash-requests", type=int, default=50, help="timed requests for register")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--mode", choices=["asgi", "uvicorn", "both"], default="asgi")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    args = parser.parse_args()
+
+    options = {
+        "users": args.users,
+        "requests": args.requests,
+        "hash_requests": args.hash_requests,
+        "concurrency": args.concurrency,
+        "scenarios": [s for s in args.scenarios.split(",") if s],
+        "modes": ["asgi", "uvicorn"] if args.mode == "both" else [args.mode],
+    }
+    unknown = set(options["scenarios"]) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = run(options)
+    for mode_run in report["runs"]:
+        for scenario in mode_run["scenarios"]:
+            print(json.dumps({"mode": mode_run["mode"], **scenario}))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            for line in compare(report, json.load(handle)):
+                print(line)
+
+    failures = over_budget(report)
+    for failure in failures:
+        print(f"Over budget: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,83 @@
 const API_BASE_URL = "http://localhost:8000";
 
+// Refresh this long before the access token's exp, so requests don't go out with a token about to expire
+const REFRESH_MARGIN_SECONDS = 30;
+
+// Endpoints that must never trigger a refresh themselves (a 401 here is a real answer, not an expired token)
+const NO_REFRESH_ENDPOINTS = ["/auth/login", "/auth/register", "/auth/refresh", "/auth/logout"];
+
 interface FetchOptions extends RequestInit {
   headers?: Record<string, string>;
 }
 
-export const apiFetch = async (endpoint: string, options: FetchOptions = {}) => {
-  const token = typeof window !== "undefined" ? localStorage.getItem("jwt_token") : null;
+const getToken = () => (typeof window !== "undefined" ? localStorage.getItem("jwt_token") : null);
+
+// Seconds since the epoch at which the JWT expires, or null if it can't be read (then we only refresh on 401)
+const tokenExpiry = (token: string): number | null => {
+  try {
+    const payload = token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/");
+    const { exp } = JSON.parse(atob(payload.padEnd(payload.length + ((4 - (payload.length % 4)) % 4), "=")));
+    return typeof exp === "number" ? exp : null;
+  } catch {
+    return null;
+  }
+};
+
+const logout = () => {
+  if (typeof window !== "undefined") {
+    localStorage.removeItem("jwt_token");
+    window.location.href = "/"; // Assuming / is the login/home page
+  }
+};
+
+// --- Single-flight refresh ---
+// Every caller that needs a new access token while a refresh is running waits for that same refresh.
+// The backend rotates the refresh token on each call, so a second concurrent /auth/refresh would
+// present an already-deleted token, fail, and log the user out.
+let refreshInFlight: Promise<string | null> | null = null;
+
+const refreshAccessToken = (): Promise<string | null> => {
+  if (refreshInFlight) return refreshInFlight;
+
+  refreshInFlight = (async () => {
+    try {
+      // We rely on the HttpOnly cookie for the refresh token
+      const refreshResponse = await fetch(`${API_BASE_URL}/auth/refresh`, {
+        method: "POST",
+        // credentials: "include" ensures cookies are sent/received
+        credentials: "include",
+      });
+
+      if (!refreshResponse.ok) {
+        // Refresh Failed -> Logout (once, for every waiting request)
+        logout();
+        return null;
+      }
+
+      const data = await refreshResponse.json();
+      if (typeof window !== "undefined") {
+        localStorage.setItem("jwt_token", data.access_token);
+      }
+      return data.access_token as string;
+    } catch (error) {
+      console.error("Token refresh failed", error);
+      logout();
+      return null;
+    } finally {
+      refreshInFlight = null;
+    }
+  })();
 
+  return refreshInFlight;
+};
+
+// --- In-flight GET deduplication ---
+// Identical GETs (same endpoint, same token, same options) issued while one is pending share its
+// response; each caller gets its own clone, so every one of them can read the body. A request with
+// an AbortSignal is never shared: aborting it must not cancel other callers, nor be ignored.
+const getsInFlight = new Map<string, Promise<Response>>();
+
+const request = async (endpoint: string, options: FetchOptions, token: string | null) => {
   const headers: Record<string, string> = {
     "Content-Type": "application/json",
     ...(token && { Authorization: `Bearer ${token}` }),
@@ -17,60 +88,54 @@ export const apiFetch = async (endpoint: string, options: FetchOptions = {}) =>
     delete headers["Content-Type"];
   }
 
-  const config: RequestInit = {
+  return fetch(`${API_BASE_URL}${endpoint}`, {
     ...options,
     headers,
     credentials: "include",
-  };
+  });
+};
+
+const fetchWithRefresh = async (endpoint: string, options: FetchOptions) => {
+  const refreshable = !NO_REFRESH_ENDPOINTS.includes(endpoint);
+  let token = getToken();
 
-  let response = await fetch(`${API_BASE_URL}${endpoint}`, config);
+  // Proactive refresh: don't wait for a 401 if the token expires within the margin
+  if (refreshable && token) {
+    const exp = tokenExpiry(token);
+    if (exp !== null && exp - Date.now() / 1000 < REFRESH_MARGIN_SECONDS) {
+      token = (await refreshAccessToken()) ?? token;
+    }
+  }
+
+  let response = await request(endpoint, options, token);
 
   // Handle 401 Unauthorized (Token Expired)
-  if (response.status === 401) {
-    // Attempt Refresh
-    try {
-      // We rely on the HttpOnly cookie for the refresh token
-      const refreshResponse = await fetch(`${API_BASE_URL}/auth/refresh`, {
-        method: "POST",
-        // credentials: "include" ensures cookies are sent/received
-        credentials: "include", 
-      });
+  if (response.status === 401 && refreshable && token) {
+    // Another request may have refreshed while this one was in flight: then just retry with its token
+    const current = getToken();
+    const newAccessToken = current !== token ? current : await refreshAccessToken();
 
-      if (refreshResponse.ok) {
-        const data = await refreshResponse.json();
-        const newAccessToken = data.access_token;
-        
-        if (typeof window !== "undefined") {
-          localStorage.setItem("jwt_token", newAccessToken);
-        }
-
-        // Retry Original Request with new Token
-        const newHeaders = {
-          ...headers,
-          Authorization: `Bearer ${newAccessToken}`,
-        };
-        
-        response = await fetch(`${API_BASE_URL}${endpoint}`, {
-          ...options,
-          headers: newHeaders,
-        });
-      } else {
-        // Refresh Failed -> Logout
-        if (typeof window !== "undefined") {
-            // Only redirect if we are not already on the login page (to avoid loops, though handled by app usually)
-            // But for now, just clear and reload or let the app handle it.
-            localStorage.removeItem("jwt_token");
-            window.location.href = "/"; // Assuming / is the login/home page
-        }
-      }
-    } catch (error) {
-       console.error("Token refresh failed", error);
-       if (typeof window !== "undefined") {
-          localStorage.removeItem("jwt_token");
-          window.location.href = "/";
-       }
+    if (newAccessToken) {
+      // Retry Original Request with new Token
+      response = await request(endpoint, options, newAccessToken);
     }
   }
 
   return response;
 };
+
+export const apiFetch = async (endpoint: string, options: FetchOptions = {}) => {
+  const method = (options.method ?? "GET").toUpperCase();
+  if (method !== "GET" || options.body || options.signal) {
+    return fetchWithRefresh(endpoint, options);
+  }
+
+  // Every remaining option (headers, cache, credentials, mode, redirect...) is plain data and part of the key
+  const key = JSON.stringify([getToken(), endpoint, options]);
+  let shared = getsInFlight.get(key);
+  if (!shared) {
+    shared = fetchWithRefresh(endpoint, options).finally(() => getsInFlight.delete(key));
+    getsInFlight.set(key, shared);
+  }
+  return (await shared).clone();
+};
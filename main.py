@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -5,26 +7,72 @@ from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from src.controllers import home_controller, auth_controller, leaderboard_controller
-from src.database import engine, Base
+from src.controllers import home_controller, auth_controller, admin_controller, jwks_controller, leaderboard_controller, metrics_controller
+from src.config import settings
+from src.database import engine, async_engine, async_write_engine, Base
 from src.middleware.security_headers import SecurityHeadersMiddleware
+from src.middleware.request_id import RequestIdMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.response_cache import ResponseCacheMiddleware
+from src.instrumentation import install_query_counter
 from src.limiter import limiter
-from src.logging_config import setup_logging
+from src.validation_errors import validation_error_log
+from src.responses import FastJSONResponse
+from src.password_hasher import PasswordHasherBusy, password_hasher
+from src.services.token_store import token_store
+from src.services.revocation_bus import revocation_bus
+from src.services.token_reaper import token_reaper
+from src.logging_config import logger, setup_logging, shutdown_logging
 
-# Initialize Logging
-setup_logging()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup. Logging (file handler, logs/ directory, writer thread) is set up here rather
+    # than at import, so importing the app stays cheap for the CLI, the launcher and tests.
+    setup_logging()
+    if settings.db_create_all:
+        # Note: Migrations (Alembic) are preferred, but this ensures tables exist if migrations aren't run.
+        async with async_write_engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    # Resolve the hashing policy now (BCRYPT_ROUNDS=auto times bcrypt on this host)
+    policy = password_hasher.policy
+    logger.info("Password hashing: %s, bcrypt rounds=%d%s", policy.scheme, policy.bcrypt_rounds,
+                " (calibrated)" if policy.calibrated else "")
+    # Revocations still in force are loaded before the first request is served
+    await revocation_bus.start()
+    if settings.refresh_token_reaper_enabled:
+        token_reaper.start()
+    yield
+    # Shutdown: stop background work, commit queued refresh-token writes,
+    # then release pooled connections and hashing processes
+    await token_reaper.stop()
+    await revocation_bus.stop()
+    await token_store.flush()
+    await async_engine.dispose()
+    await async_write_engine.dispose()
+    password_hasher.shutdown()
+    # Last, so records logged during shutdown are still written
+    shutdown_logging()
 
 # Equivalent to SpringApplication.run()
-app = FastAPI(title="Lab 10 Security App")
+# Responses are rendered with FastJSONResponse (orjson / pydantic-core) unless a route says otherwise
+app = FastAPI(title="Lab 10 Security App", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # --- Rate Limiter ---
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # --- Middleware ---
+# Response cache for routes declared with @cache_response. Added first (innermost) so cached
+# responses still get the security headers below.
+if settings.response_cache_enabled:
+    app.add_middleware(ResponseCacheMiddleware)
+
 # Security Headers (Custom)
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Request ID (X-Request-ID), attached to every log record of the request
+app.add_middleware(RequestIdMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -34,43 +82,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Metrics and ?profile=1 (opt-in). Added last so latency includes the other middleware.
+if settings.metrics_enabled:
+    install_query_counter(engine, async_engine.sync_engine, async_write_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+
 # --- Exception Handlers ---
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     # Sanitize the error details to handle bytes (which are not JSON serializable)
     errors = exc.errors()
     for error in errors:
-        if 'input' in error and isinstance(error['input'], bytes):
-            error['input'] = "<bytes omitted>"
-            
-    # Use logger instead of print
-    import logging
-    logger = logging.getLogger("app_logger")
-    logger.error(f"Validation Error: {errors}")
-    
-    try:
-        # Try to parse as JSON first
-        body = await request.json()
-        logger.debug(f"Request Body (JSON): {body}")
-    except Exception:
-        # If JSON parse fails, it might be form data or bytes
-        logger.debug("Request Body: <Could not parse as JSON, likely Form Data>")
-        
+        if isinstance(error.get("input"), bytes):
+            error["input"] = "<bytes omitted>"
+    # Sampled and counted; the body FastAPI already parsed is only rendered at DEBUG (never re-read)
+    validation_error_log.record(request.scope, errors, exc.body)
     return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
         content={"detail": errors},
     )
 
-# Initialize Database (Create tables)
-# Note: Migrations (Alembic) are preferred, but this ensures tables exist if migrations aren't run.
-Base.metadata.create_all(bind=engine)
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Fail fast instead of queueing more bcrypt work than the pool can absorb
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 # Register Controllers (Routers)
 app.include_router(home_controller.router)
 app.include_router(auth_controller.router)
+app.include_router(admin_controller.router)
+app.include_router(jwks_controller.router)
 app.include_router(leaderboard_controller.router)
+if settings.metrics_enabled:
+    app.include_router(metrics_controller.router)
 
 if __name__ == "__main__":
     import uvicorn
-    # Runs the server on port 8000
+    # Development server on port 8000 (production: python -m src.server)
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
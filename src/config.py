@@ -0,0 +1,137 @@
+import os
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Settings(BaseSettings):
+    """
+    Every configuration knob, read once from the environment and the project's .env file
+    (environment variables win). Field names are the variable names in lower case; see
+    .env.example for descriptions. Equivalent to Spring Boot's @ConfigurationProperties.
+    """
+
+    model_config = SettingsConfigDict(env_file=os.path.join(ROOT, ".env"), env_ignore_empty=True, extra="ignore")
+
+    # --- Database (src/database.py) ---
+    database_url: str = "sqlite:///./app.db"
+    # Derived from database_url when unset: sqlite -> aiosqlite, postgresql -> asyncpg
+    async_database_url: str | None = None
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # Create missing tables at startup (dev convenience). The production launcher (src/server.py)
+    # runs the Alembic migrations instead and turns this off for its workers.
+    db_create_all: bool = True
+    sqlite_profile: str = "performance"  # performance | default
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kb: int = 64 * 1024
+    sqlite_read_pool_size: int = 8
+
+    # --- Access tokens (src/tokens.py) ---
+    secret_key: str = "fallback_secret_key_for_dev_only_12345"
+    algorithm: str = "HS256"
+    jwt_keys: str | None = None  # JSON list of keys, see src/tokens.py
+    jwt_active_kid: str | None = None  # signing key; defaults to the first key that can sign
+    jwt_backend: str = "native"  # native | jose
+
+    # --- Password hashing (src/password_hasher.py) ---
+    # 0 workers disables the pool and hashes inline (useful for tests and one-off scripts)
+    password_hash_workers: int = os.cpu_count() or 1
+    # Hash/verify jobs queued or running before we answer 503 (default: 8 per worker)
+    password_hash_max_pending: int | None = None
+    # Scheme for new hashes: bcrypt, or argon2 (argon2id; needs `pip install argon2-cffi`).
+    # Hashes of the other scheme still verify and are upgraded on login.
+    password_hash_scheme: str = "bcrypt"
+    # A fixed number of rounds, or "auto" to calibrate at startup so one hash takes about
+    # password_hash_target_ms on this host (clamped to bcrypt_min_rounds..bcrypt_max_rounds)
+    bcrypt_rounds: str = "auto"
+    # passlib's default cost (12), which hashes had before calibration: calibration can only raise it
+    bcrypt_min_rounds: int = 12
+    bcrypt_max_rounds: int = 16
+    password_hash_target_ms: float = 250
+    # argon2id profile
+    argon2_time_cost: int = 3
+    argon2_memory_cost_kb: int = 65536
+    argon2_parallelism: int = 4
+    # Re-hash weaker (or other-scheme) hashes after a successful login
+    password_rehash_on_login: bool = True
+
+    # --- Verified access-token cache (src/token_cache.py) ---
+    token_cache_max_entries: int = 10000
+    # Upper bound on how long a cached entry may outlive a change we were not told about
+    # (e.g. a user deleted directly in the DB or by another worker process)
+    token_cache_ttl_seconds: float = 60
+
+    # --- Refresh tokens (src/services/token_store.py, token_reaper.py) ---
+    # Writes arriving within this window share one transaction (one commit / fsync). 0 disables batching.
+    token_write_batch_window_ms: float = 2
+    # A batch is flushed early once it holds this many writes
+    token_write_batch_max: int = 128
+    refresh_token_reaper_enabled: bool = True
+    refresh_token_reaper_interval_seconds: float = 300
+    refresh_token_reaper_batch_size: int = 1000
+    # Revoked tokens are kept this long for auditing (e.g. spotting reuse of a logged-out token)
+    refresh_token_retention_days: float = 30
+
+    # --- Access-token revocation (src/services/revocation_bus.py) ---
+    # How often each worker reads revocations made by the others (the worker that revokes applies it at once)
+    revocation_poll_interval_ms: float = 500
+
+    # --- Rate limiting (src/limiter.py) ---
+    # Shared by all workers on the host by default; any limits URI works (e.g. redis://localhost:6379)
+    rate_limit_storage_uri: str = "sqlite:///./ratelimit.db"
+    rate_limit_strategy: str = "sliding-window-counter"
+
+    # --- Logging (src/logging_config.py) ---
+    log_level: str = "INFO"
+    log_file: str = "logs/app.log"
+    log_format: str = "text"  # text | json
+    log_rotation: str = "size"  # size | time | none
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_rotate_when: str = "midnight"
+    log_backup_count: int = 5
+    # Records beyond this many waiting to be written are dropped (and counted) instead of blocking
+    log_queue_size: int = 10000
+
+    # --- Validation-error logging (src/validation_errors.py) ---
+    # Each kind of 422 (method, route, error locations/types) is logged once per window; the rest are counted
+    validation_log_window_seconds: float = 60
+    validation_log_max_signatures: int = 1000
+    validation_log_body_max_bytes: int = 2048  # request body shown at DEBUG, truncated
+
+    # --- Instrumentation (src/instrumentation.py) ---
+    # Off by default: timers are then returned unwrapped and no middleware/engine hooks are installed
+    metrics_enabled: bool = False
+    profile_sample_interval_ms: float = 2
+
+    # --- Response cache (src/response_cache.py) ---
+    response_cache_enabled: bool = True
+    response_cache_max_bytes: int = 32 * 1024 * 1024
+    # Larger responses are passed through uncached
+    response_cache_max_entry_bytes: int = 1024 * 1024
+
+    # --- Production launcher (src/server.py) ---
+    host: str = "0.0.0.0"
+    port: int = 8000
+    web_concurrency: int = 0  # 0 = one worker per CPU
+    graceful_shutdown_timeout: int = 30
+
+    @field_validator("sqlite_profile", "jwt_backend", "password_hash_scheme", "log_format", "log_rotation", "bcrypt_rounds")
+    @classmethod
+    def _lower(cls, value: str) -> str:
+        return value.lower()
+
+    @field_validator("sqlite_synchronous", "log_level")
+    @classmethod
+    def _upper(cls, value: str) -> str:
+        return value.upper()
+
+
+settings = Settings()
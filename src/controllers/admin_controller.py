@@ -0,0 +1,28 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import get_async_db
+from src.security import require_admin
+from src.services.user_service import AsyncUserService
+from src.streaming import stream_response
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+# Distribution of password-hash schemes/costs, to tune the hashing policy without password resets
+@router.get("/password-hashes")
+async def get_password_hash_report(db: AsyncSession = Depends(get_async_db)):
+    return await AsyncUserService(db).password_hash_report()
+
+# Every user (no password hashes) in id order, streamed in constant memory; see src/streaming.py
+@router.get("/users")
+async def list_users(
+    after: Optional[str] = Query(None, description="`next` cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size; omit to stream every remaining user"),
+    format: Literal["json", "ndjson", "columnar"] = Query("json"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        stream = AsyncUserService(db).list_users(after, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return stream_response(stream, format)
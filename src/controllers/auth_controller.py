@@ -1,53 +1,58 @@
-from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Request, Response, Cookie
-from sqlalchemy.orm import Session
-from src.database import get_db
-from src.services.user_service import UserService
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Form, Request, Response, Cookie
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import get_async_db
+from src.services.user_service import AsyncUserService, UserAlreadyExistsError
 from src.schemas import UserCreate, UserResponse
-from src.security import create_access_token, get_current_user, create_refresh_token, REFRESH_TOKEN_EXPIRE_DAYS
-from src.models.user import User
-from src.models.token import RefreshToken
+from src.responses import model_response
+from src.security import create_access_token, get_current_user, optional_oauth2_scheme, REFRESH_TOKEN_EXPIRE_DAYS
+from src.repositories.refresh_token_repository import AsyncRefreshTokenRepository
+from src.services.revocation_bus import revocation_bus
+from src.services.token_store import token_store
 from src.logging_config import logger
 from src.limiter import limiter
+from src.response_cache import cache_response
+from src.token_cache import UserSnapshot, token_cache
+from src.tokens import TokenError, token_codec
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-def get_user_service(db: Session = Depends(get_db)) -> UserService:
-    return UserService(db)
+async def get_user_service(db: AsyncSession = Depends(get_async_db)) -> AsyncUserService:
+    return AsyncUserService(db)
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_dto: UserCreate, 
-    service: UserService = Depends(get_user_service)
+    service: AsyncUserService = Depends(get_user_service)
 ):
-    existing_user = service.user_repository.find_by_email(user_dto.email)
-    if existing_user:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-    
-    created_user = service.create_user(
-        username=user_dto.username,
-        email=user_dto.email,
-        password=user_dto.password
-    )
-    logger.info(f"New user registered: {created_user.username}")
-    return created_user
+    try:
+        created_user = await service.create_user(
+            username=user_dto.username,
+            email=user_dto.email,
+            password=user_dto.password
+        )
+    except UserAlreadyExistsError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    logger.info("New user registered: %s", created_user.username)
+    # Trusted ORM data: serialized through UserResponse without re-validation
+    return model_response(UserResponse, created_user, status_code=status.HTTP_201_CREATED)
 
 @router.post("/login")
 @limiter.limit("5/minute")
-def login_for_access_token(
+async def login_for_access_token(
     request: Request,
     response: Response,
+    background_tasks: BackgroundTasks,
     username: str = Form(...),
     password: str = Form(...),
-    service: UserService = Depends(get_user_service),
-    db: Session = Depends(get_db)
+    service: AsyncUserService = Depends(get_user_service)
 ):
     ip = request.client.host
-    logger.info(f"Login attempt for user: {username} from IP: {ip}")
+    logger.info("Login attempt for user: %s from IP: %s", username, ip)
     
-    user = service.authenticate_user(identifier=username, password=password)
+    user = await service.authenticate_user(identifier=username, password=password, background_tasks=background_tasks)
     if not user:
-        logger.warning(f"Failed login attempt for user: {username} from IP: {ip}")
+        logger.warning("Failed login attempt for user: %s from IP: %s", username, ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -56,24 +61,8 @@ def login_for_access_token(
 
     # Generate Tokens
     access_token = create_access_token(data={"sub": user.email})
-    refresh_token_str = create_refresh_token()
-    
-    # Save Refresh Token
-    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    # Convert expires_at to naive datetime if using SQLite which usually stores naive
-    # But SQLAlchemy + SQLite usually handles naive best.
-    # Let's ensure it's naive UTC for compatibility if needed, or aware.
-    # SQLAlchemy DateTime typically takes naive unless configured.
-    # We'll use naive UTC.
-    expires_at_naive = expires_at.replace(tzinfo=None)
-    
-    db_refresh_token = RefreshToken(
-        token=refresh_token_str,
-        user_id=user.id,
-        expires_at=expires_at_naive
-    )
-    db.add(db_refresh_token)
-    db.commit()
+    # Save Refresh Token (group-committed with concurrent logins/refreshes)
+    refresh_token_str = await token_store.issue(user.id)
     
     # Set HttpOnly Cookie
     response.set_cookie(
@@ -85,58 +74,48 @@ def login_for_access_token(
         max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
     )
     
-    logger.info(f"Successful login for user: {username}")
+    logger.info("Successful login for user: %s", username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/refresh")
-def refresh_token(
+async def refresh_token(
     response: Response,
     request: Request,
     refresh_token: str = Cookie(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not refresh_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token missing")
 
-    # Find token in DB
-    token_entry = db.query(RefreshToken).filter(RefreshToken.token == refresh_token).first()
+    # Find token in DB, with its user (needed for the new access token) in the same query
+    token_entry = await AsyncRefreshTokenRepository(db).find_with_user(refresh_token)
     
     if not token_entry:
         # Potential Reuse or Invalid Token
-        logger.warning(f"Attempted use of invalid refresh token from IP: {request.client.host}")
+        logger.warning("Attempted use of invalid refresh token from IP: %s", request.client.host)
         response.delete_cookie("refresh_token")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
     if token_entry.revoked:
         # SECURITY ALERT: Revoked token used!
-        logger.critical(f"SECURITY ALERT: Revoked refresh token used! User ID: {token_entry.user_id}, IP: {request.client.host}")
+        logger.critical("SECURITY ALERT: Revoked refresh token used! User ID: %s, IP: %s", token_entry.user_id, request.client.host)
         response.delete_cookie("refresh_token")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
 
     if token_entry.expires_at < datetime.utcnow():
-        logger.info(f"Expired refresh token used. User ID: {token_entry.user_id}")
+        logger.info("Expired refresh token used. User ID: %s", token_entry.user_id)
         response.delete_cookie("refresh_token")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
 
-    # Token Valid -> Rotate
-    # 1. Revoke/Delete old
-    db.delete(token_entry)
-    db.commit()
-    
-    # 2. Issue New
-    user = db.query(User).filter(User.id == token_entry.user_id).first()
+    # Token Valid -> Rotate (delete old + insert new in one transaction)
+    user = token_entry.user
+    new_refresh_token_str = await token_store.rotate(refresh_token, token_entry.user_id)
+    if new_refresh_token_str is None:
+        # Lost a race with a concurrent refresh/logout using the same token
+        logger.warning("Concurrent reuse of refresh token. User ID: %s, IP: %s", token_entry.user_id, request.client.host)
+        response.delete_cookie("refresh_token")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
     new_access_token = create_access_token(data={"sub": user.email})
-    new_refresh_token_str = create_refresh_token()
-    
-    expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    
-    new_db_token = RefreshToken(
-        token=new_refresh_token_str,
-        user_id=user.id,
-        expires_at=expires_at
-    )
-    db.add(new_db_token)
-    db.commit()
     
     # Set New Cookie
     response.set_cookie(
@@ -148,27 +127,47 @@ def refresh_token(
         max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
     )
     
-    logger.info(f"Token refreshed for user: {user.username}")
+    logger.info("Token refreshed for user: %s", user.username)
     return {"access_token": new_access_token, "token_type": "bearer"}
 
 @router.post("/logout")
-def logout(
+async def logout(
     response: Response,
     refresh_token: str = Cookie(None),
-    db: Session = Depends(get_db)
+    access_token: str | None = Depends(optional_oauth2_scheme),
 ):
+    user_id = None
     if refresh_token:
-        token_entry = db.query(RefreshToken).filter(RefreshToken.token == refresh_token).first()
-        if token_entry:
-            # We can mark as revoked or delete. Deleting cleans up DB. Revoking allows auditing.
-            # Lab usually asks to "Revoke".
-            token_entry.revoked = True
-            db.commit()
-            logger.info(f"User logged out, token revoked. User ID: {token_entry.user_id}")
+        # We can mark as revoked or delete. Deleting cleans up DB. Revoking allows auditing.
+        # Lab usually asks to "Revoke".
+        user_id = await token_store.revoke(refresh_token)
+        if user_id is not None:
+            # Drop cached access-token verifications so the next request re-checks the user
+            token_cache.invalidate_user(user_id)
+            logger.info("User logged out, token revoked. User ID: %s", user_id)
+
+    if access_token:
+        # The access token presented with the logout stops working now, not at its exp
+        try:
+            claims = token_codec.decode(access_token)
+        except TokenError:
+            claims = {}
+        if claims.get("jti") and claims.get("exp"):
+            await revocation_bus.revoke_token(user_id, claims["jti"], claims["exp"])
     
     response.delete_cookie("refresh_token")
     return {"message": "Logged out successfully"}
 
+@router.post("/logout-all")
+async def logout_all(response: Response, current_user: UserSnapshot = Depends(get_current_user)):
+    # Every session of the user: all refresh tokens, and all access tokens issued until now
+    revoked = await token_store.revoke_all(current_user.id)
+    await revocation_bus.revoke_user(current_user.id)
+    logger.info("User logged out everywhere, %d refresh tokens revoked. User ID: %s", revoked, current_user.id)
+    response.delete_cookie("refresh_token")
+    return {"message": "Logged out from all sessions"}
+
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+@cache_response(ttl_seconds=60, vary_user=True)
+async def read_users_me(current_user: UserSnapshot = Depends(get_current_user)):
+    return model_response(UserResponse, current_user)
\ No newline at end of file
@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Header, Depends
-from fastapi.responses import JSONResponse
+from src.responses import FastJSONResponse
+from src.response_cache import cache_response
 from src.security import get_current_user
-from src.models.user import User
+from src.token_cache import UserSnapshot
 
 router = APIRouter()
 
 @router.get("/hello")
-def say_hello(current_user: User = Depends(get_current_user)):
-    return JSONResponse(content={"message": f"Hello {current_user.username}"})
+async def say_hello(current_user: UserSnapshot = Depends(get_current_user)):
+    return FastJSONResponse(content={"message": f"Hello {current_user.username}"})
 
 # This endpoint remains public
 @router.get("/agent")
-def get_user_agent(user_agent: str = Header(None)):
+@cache_response(ttl_seconds=300, vary_headers=("User-Agent",))
+async def get_user_agent(user_agent: str = Header(None)):
     return {"user_agent": user_agent}
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from src.responses import FastJSONResponse
+from src.tokens import token_codec
+
+router = APIRouter(tags=["Auth"])
+
+# The keyring is fixed for the lifetime of the process, so the document is built once
+_JWKS = token_codec.jwks()
+
+# Public keys (ES256/EdDSA only) so other services can verify access tokens locally
+@router.get("/.well-known/jwks.json")
+async def get_jwks():
+    return FastJSONResponse(content=_JWKS, headers={"Cache-Control": "public, max-age=300"})
@@ -1,36 +1,82 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from src.database import get_db
-from src.models.user import User
-import random
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import get_async_db
+from src.limiter import limiter
+from src.response_cache import cache_response
+from src.responses import FastJSONResponse
+from src.services.leaderboard_service import AsyncLeaderboardService
+from src.streaming import stream_response
 
 router = APIRouter(tags=["Leaderboard"])
 
+async def get_leaderboard_service(db: AsyncSession = Depends(get_async_db)) -> AsyncLeaderboardService:
+    return AsyncLeaderboardService(db)
+
+def _not_modified(request: Request, etag: str, last_modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
 @router.get("/leaderboard")
-def get_leaderboard(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    
-    leaderboard_data = []
-    
-    # Calculate scores and build list
-    for user in users:
-        # Demo Hack: Random score between 1000 and 10000
-        # In a real app, this would be user.score or a sum of solved challenges
-        score = random.randint(1000, 10000)
-        
-        leaderboard_data.append({
-            "username": user.username,
-            "score": score,
-            "role": "Admin" if "admin" in user.username.lower() else "User" # Simple role logic based on name or column if exists
-        })
-    
-    # Sort by Score (Descending)
-    leaderboard_data.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Assign Rank
-    ranked_leaderboard = []
-    for index, entry in enumerate(leaderboard_data):
-        entry["rank"] = index + 1
-        ranked_leaderboard.append(entry)
-        
-    return ranked_leaderboard
+# Invalidated in-process on every score/user write; the TTL bounds staleness from other workers
+@cache_response(ttl_seconds=10, tags=("leaderboard",))
+async def get_leaderboard(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    around: Optional[str] = Query(None, description="Return the page centred on this username"),
+    service: AsyncLeaderboardService = Depends(get_leaderboard_service),
+):
+    # Cheap validator query first: MAX(updated_at) is an index lookup
+    version = await service.last_modified()
+    last_modified = version.replace(tzinfo=timezone.utc) if version else None
+    etag = f'W/"lb-{int(last_modified.timestamp() * 1_000_000) if last_modified else 0}"'
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if around is not None:
+        entries = await service.get_around(around, limit)
+        if entries is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    else:
+        entries = await service.get_page(offset, limit)
+
+    # Plain rows built by the service: straight to bytes, no response-model validation or jsonable_encoder
+    return FastJSONResponse(entries, headers=headers)
+
+# Keyset-paginated (or complete) ranking streamed in constant memory, for bulk consumers.
+# Not response-cached: bodies can be arbitrarily large. Public, so rate limited (each call reads
+# up to the whole table, one short query per batch).
+@router.get("/leaderboard/stream")
+@limiter.limit("10/minute")
+async def stream_leaderboard(
+    request: Request,
+    after: Optional[str] = Query(None, description="`next` cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size; omit to stream the rest of the ranking"),
+    format: Literal["json", "ndjson", "columnar"] = Query("json"),
+    service: AsyncLeaderboardService = Depends(get_leaderboard_service),
+):
+    try:
+        stream = await service.stream(after, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return stream_response(stream, format)
@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.instrumentation import metrics
+from src import logging_config
+from src.password_hasher import password_hasher
+from src.revocation import revocation_list
+from src.services.revocation_bus import revocation_bus
+from src.services.token_reaper import token_reaper
+from src.token_cache import token_cache
+from src.validation_errors import validation_error_log
+
+router = APIRouter(tags=["Metrics"])
+
+def _component_stats() -> dict[str, tuple[str, float]]:
+    hashing = password_hasher.metrics.snapshot()
+    reaper = token_reaper.stats.snapshot()
+    revocations = revocation_bus.stats.snapshot()
+    validation = validation_error_log.snapshot()
+    return {
+        "app_password_hash_completed_total": ("counter", hashing["completed"]),
+        "app_password_hash_rejected_total": ("counter", hashing["rejected"]),
+        "app_password_hash_wait_seconds_total": ("counter", hashing["wait_seconds_total"]),
+        "app_password_hash_seconds_total": ("counter", hashing["hash_seconds_total"]),
+        "app_password_hash_pending": ("gauge", password_hasher.pending),
+        "app_password_rehashed_total": ("counter", hashing["rehashed"]),
+        "app_password_hash_bcrypt_rounds": ("gauge", password_hasher.policy.bcrypt_rounds),
+        "app_token_reaper_runs_total": ("counter", reaper["runs"]),
+        "app_token_reaper_errors_total": ("counter", reaper["errors"]),
+        "app_token_reaper_rows_reaped_total": ("counter", reaper["rows_reaped"]),
+        "app_token_reaper_batch_seconds_max": ("gauge", reaper["batch_seconds_max"]),
+        "app_token_cache_entries": ("gauge", len(token_cache)),
+        "app_revocations_published_total": ("counter", revocations["published"]),
+        "app_revocation_events_applied_total": ("counter", revocations["applied"]),
+        "app_revocation_poll_errors_total": ("counter", revocations["errors"]),
+        "app_revocation_entries": ("gauge", len(revocation_list)),
+        "app_validation_errors_total": ("counter", validation["total"]),
+        "app_validation_errors_logged_total": ("counter", validation["logged"]),
+        "app_validation_errors_suppressed_total": ("counter", validation["suppressed"]),
+        "app_log_records_dropped_total": ("counter", logging_config.queue_handler.dropped if logging_config.queue_handler else 0),
+    }
+
+# Prometheus text exposition format; only registered when METRICS_ENABLED is set
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(_component_stats()), media_type="text/plain; version=0.0.4")
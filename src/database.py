@@ -1,12 +1,68 @@
-from sqlalchemy import create_engine
+from fastapi import Depends
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
-from dotenv import load_dotenv
+from src.config import settings
 
-load_dotenv()
+# Async drivers used when DATABASE_URL names a sync (or no) driver
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+def to_async_url(url: str) -> str:
+    """Maps e.g. sqlite:///./app.db -> sqlite+aiosqlite:///./app.db, postgresql://... -> postgresql+asyncpg://..."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in ASYNC_DRIVERS.values() or backend not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+DATABASE_URL = settings.database_url
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_url(DATABASE_URL)
+
+# --- SQLite performance profile ---
+# "performance": WAL + tuned pragmas on every connection, and all writes routed through a
+# single-connection writer pool while reads use their own pool. "default": SQLite defaults.
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+SQLITE_TUNED = settings.sqlite_profile == "performance" and _is_sqlite_file(DATABASE_URL)
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a writer commits; NORMAL only fsyncs at checkpoints
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    # Wait for the write lock instead of failing immediately with "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+# Connection pool settings (ignored for in-memory SQLite, which uses a single static connection)
+def _pool_options(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    if SQLITE_TUNED and parsed.get_backend_name() == "sqlite":
+        return {"pool_size": settings.sqlite_read_pool_size, "max_overflow": 0, "pool_timeout": settings.db_pool_timeout}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
 
 # Equivalent to Spring Boot's DataSource configuration
 # check_same_thread=False is needed only for SQLite
@@ -16,6 +72,61 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: DB I/O is awaited on the event loop instead of occupying threadpool workers
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL))
+
+if SQLITE_TUNED:
+    # SQLite allows one writer at a time: queue writers on a single pooled connection
+    # instead of letting several connections race for the lock.
+    async_write_engine = create_async_engine(
+        ASYNC_DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=settings.db_pool_timeout
+    )
+    for _engine in (engine, async_engine.sync_engine, async_write_engine.sync_engine):
+        event.listen(_engine, "connect", _apply_sqlite_pragmas)
+else:
+    async_write_engine = async_engine
+
+class RoutingSession(Session):
+    """
+    Sends flushes and INSERT/UPDATE/DELETE statements to the writer engine, everything else to the readers.
+
+    Once a transaction has written, its later reads also go to the writer until it ends, so the
+    session reads its own uncommitted writes (a reader connection would not see them).
+    """
+
+    _wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._wrote or self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self._wrote = True
+            return async_write_engine.sync_engine
+        return async_engine.sync_engine
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_write_routing(session, transaction):
+    # Commit or rollback of the outermost transaction: back to the readers
+    if transaction.parent is None:
+        session._wrote = False
+
+# expire_on_commit=False: async sessions cannot lazy-load attributes after a commit
+if SQLITE_TUNED:
+    AsyncSessionLocal = async_sessionmaker(
+        class_=AsyncSession, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+    )
+else:
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+# A forked child must not reuse the parent's pooled connections: give it fresh, empty pools
+# (close=False leaves the parent's connections alone)
+def _dispose_pools_after_fork():
+    for _engine in {engine, async_engine.sync_engine, async_write_engine.sync_engine}:
+        _engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_pools_after_fork)
+
 Base = declarative_base()
 
 def get_db():
@@ -28,3 +139,45 @@ def get_db():
         yield db
     finally:
         db.close()
+
+class UnitOfWork:
+    """
+    The database work of one request (Spring's request-bound EntityManager, as in Open Session
+    in View): every dependency and the handler share one AsyncSession, so one identity map and
+    one transaction.
+
+    The session is only created when first asked for, and it checks a connection out of the pool
+    on its first statement. A request that never queries (a cached token, /agent) never touches
+    the pool. Under SQLITE_PROFILE=performance a request that writes also holds the writer
+    connection (see RoutingSession). Components that batch work across requests
+    (RefreshTokenStore, RevocationBus, the reaper) keep their own sessions.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    async def close(self):
+        # Rolls back whatever the request did not commit and returns its connections
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+async def get_unit_of_work():
+    """Request-scoped: FastAPI resolves it once per request, and closes it after the response is sent."""
+    unit_of_work = UnitOfWork()
+    try:
+        yield unit_of_work
+    finally:
+        await unit_of_work.close()
+
+# async def, like the service factories: FastAPI runs plain def dependencies in the threadpool
+async def get_async_db(unit_of_work: UnitOfWork = Depends(get_unit_of_work)) -> AsyncSession:
+    """Async counterpart of get_db(): the request's session (see UnitOfWork)."""
+    return unit_of_work.session
@@ -0,0 +1,232 @@
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import Counter
+
+from src.config import settings
+
+# Prometheus' default buckets, extended down to 100µs for cache hits and indexed lookups
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labelvalues, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {values[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {values[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {values[-1]}")
+        return lines
+
+
+class Metrics:
+    """The application's metric families."""
+
+    def __init__(self):
+        self.operation_seconds = Histogram(
+            "app_operation_duration_seconds", "Time spent in instrumented hot-path operations.", ("operation",)
+        )
+        self.request_seconds = Histogram(
+            "app_http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")
+        )
+        self.request_queries = Histogram(
+            "app_db_queries_per_request", "SQL statements executed per HTTP request.", ("route",), QUERY_COUNT_BUCKETS
+        )
+        self.queries_total = 0
+        # Engine events fire on the loop and on threadpool threads (sync engine) alike
+        self._queries_lock = threading.Lock()
+
+    def count_query(self):
+        with self._queries_lock:
+            self.queries_total += 1
+
+    def render(self, extra: dict[str, tuple[str, float]] | None = None) -> str:
+        """`extra` maps metric name -> (type, value) for stats kept by other components."""
+        lines = []
+        for histogram in (self.operation_seconds, self.request_seconds, self.request_queries):
+            lines.extend(histogram.render())
+        lines += [
+            "# HELP app_db_queries_total SQL statements executed.",
+            "# TYPE app_db_queries_total counter",
+            f"app_db_queries_total {self.queries_total}",
+        ]
+        for name, (kind, value) in (extra or {}).items():
+            lines += [f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# --- Timers ---
+class _Timer:
+    __slots__ = ("operation", "started")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        metrics.operation_seconds.observe(time.perf_counter() - self.started, self.operation)
+        return False
+
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def timer(operation: str):
+    """`with timer("jwt.decode"):` - a shared no-op context manager when metrics are disabled."""
+    return _Timer(operation) if settings.metrics_enabled else _NULL_TIMER
+
+
+def timed(operation: str):
+    """Decorator timing a sync or async function. Returns the function untouched when disabled."""
+
+    def decorator(func):
+        if not settings.metrics_enabled:
+            return func
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _Timer(operation):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(operation):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def timed_methods(prefix: str):
+    """Class decorator applying `timed("<prefix>.<method>")` to every public method."""
+
+    def decorator(cls):
+        if not settings.metrics_enabled:
+            return cls
+        for name, member in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.isfunction(member):
+                setattr(cls, name, timed(f"{prefix}.{name}")(member))
+        return cls
+
+    return decorator
+
+
+# --- Queries per request ---
+# Holds a one-element list for the request being served; engine events increment it in place
+request_queries: contextvars.ContextVar[list | None] = contextvars.ContextVar("request_queries", default=None)
+
+
+def _count_query(*args):
+    metrics.count_query()
+    counter = request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def install_query_counter(*engines):
+    from sqlalchemy import event
+
+    for engine in {id(e): e for e in engines}.values():
+        event.listen(engine, "before_cursor_execute", _count_query)
+
+
+# --- Sampling profiler ---
+class StackSampler:
+    """
+    Samples the stacks of every thread at a fixed interval from a background thread.
+
+    Output is in folded format (`thread;frame;frame count` per line), which flamegraph.pl,
+    speedscope and inferno read directly. Only one sampler may run at a time.
+    """
+
+    _running = threading.Lock()
+
+    def __init__(self, interval_seconds: float = settings.profile_sample_interval_ms / 1000):
+        self.interval_seconds = interval_seconds
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> bool:
+        if not StackSampler._running.acquire(blocking=False):
+            return False
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            StackSampler._running.release()
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
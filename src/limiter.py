@@ -1,4 +1,28 @@
+from fastapi import Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+import src.limiter_storage  # noqa: F401  (registers the sqlite:// rate limit storage)
+from src.config import settings
+from src.token_cache import token_cache
+
+def get_rate_limit_key(request: Request) -> str:
+    """
+    Authenticated callers are limited per user, everyone else per client IP.
+
+    Only tokens already verified by get_current_user (i.e. present in the token cache) count as
+    an identity, so forged or random bearer tokens cannot be used to dodge the IP limit.
+    Limits are additionally scoped per route by slowapi.
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        cached = token_cache.get(authorization[7:])
+        if cached is not None:
+            return f"user:{cached.user.id}"
+    return f"ip:{get_remote_address(request)}"
+
+limiter = Limiter(
+    key_func=get_rate_limit_key,
+    storage_uri=settings.rate_limit_storage_uri,
+    strategy=settings.rate_limit_strategy,
+)
@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+from limits.storage.base import TimestampedSlidingWindow
+
+from src.logging_config import logger
+
+# Expired counters are purged after this many writes (per process)
+COMPACT_EVERY_WRITES = 1000
+# How long a check waits for another worker's write lock. slowapi calls the storage synchronously
+# on the event loop, so this is time the whole worker stands still; past it the check fails open.
+DEFAULT_BUSY_TIMEOUT_MS = 10
+# Fail-open checks are logged once, then once per this many
+LOG_CONTENTION_EVERY = 1000
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Rate limit storage shared by every worker process on one host.
+
+    Counters live in a small WAL-mode SQLite file, so all uvicorn workers enforce the same
+    budget. Each check is a couple of primary-key lookups plus one upsert inside a single
+    BEGIN IMMEDIATE transaction, which also makes the sliding-window check-and-increment
+    atomic across processes. Expired counters are deleted periodically so the table stays
+    proportional to the number of active keys.
+
+    The checks block the event loop (slowapi is synchronous), so a check never waits more than
+    `busy_timeout_ms` for the write lock. If another worker holds it longer, the request is
+    admitted without being counted (fail open) and `contended` is incremented.
+
+    URI format follows SQLAlchemy: ``sqlite:///./ratelimit.db`` (relative) or
+    ``sqlite:////var/run/app/ratelimit.db`` (absolute). Any limits-supported URI such as
+    ``redis://localhost:6379`` can be configured instead without code changes.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options):
+        prefix = "sqlite:///"
+        self.path = uri[len(prefix):] if uri and uri.startswith(prefix) and len(uri) > len(prefix) else ":memory:"
+        self.busy_timeout_ms = int(options.get("busy_timeout_ms", DEFAULT_BUSY_TIMEOUT_MS))
+        self._local = threading.local()
+        self._writes = 0
+        self.contended = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    # --- Connection handling (one connection per thread, created lazily) ---
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            connection.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Counters are disposable: losing the last few increments on power loss is fine
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _read(self, connection: sqlite3.Connection, key: str, now: float) -> tuple[int, float]:
+        row = connection.execute("SELECT count, expires_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return 0, now
+        return row[0], row[1]
+
+    def _incr(self, connection: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        connection.execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?1, ?2, ?3 + ?4) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            " count = CASE WHEN expires_at <= ?3 THEN ?2 ELSE count + ?2 END, "
+            " expires_at = CASE WHEN expires_at <= ?3 THEN ?3 + ?4 ELSE expires_at END",
+            (key, amount, now, expiry),
+        )
+        return self._read(connection, key, now)[0]
+
+    def _begin_write(self, connection: sqlite3.Connection) -> bool:
+        """Takes the write lock; False if another process held it past the busy timeout."""
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            return True
+        except sqlite3.OperationalError as exc:
+            if "locked" not in str(exc) and "busy" not in str(exc):
+                raise
+        self.contended += 1
+        if self.contended == 1 or self.contended % LOG_CONTENTION_EVERY == 0:
+            logger.warning("Rate limit storage locked for over %d ms; admitted %d request(s) uncounted",
+                           self.busy_timeout_ms, self.contended)
+        return False
+
+    def _after_write(self, connection: sqlite3.Connection):
+        self._writes += 1
+        if self._writes % COMPACT_EVERY_WRITES == 0:
+            connection.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (time.time(),))
+
+    # --- Fixed window API ---
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        connection = self._connection()
+        if not self._begin_write(connection):
+            return 0
+        try:
+            count = self._incr(connection, key, expiry, amount, time.time())
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._after_write(connection)
+        return count
+
+    def get(self, key: str) -> int:
+        return self._read(self._connection(), key, time.time())[0]
+
+    def get_expiry(self, key: str) -> float:
+        return self._read(self._connection(), key, time.time())[1]
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        return self._connection().execute("DELETE FROM rate_limits").rowcount
+
+    # --- Sliding window counter API ---
+    def _window_info(self, connection, key: str, expiry: int, now: float):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._read(connection, previous_key, now)[0]
+        current_count = self._read(connection, current_key, now)[0]
+        previous_ttl = 0.0 if previous_count == 0 else (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl, current_key
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        connection = self._connection()
+        now = time.time()
+        # Check and increment under one write lock: no over-admission across processes
+        if not self._begin_write(connection):
+            return True
+        try:
+            previous_count, previous_ttl, current_count, _, current_key = self._window_info(
+                connection, key, expiry, now
+            )
+            allowed = floor(previous_count * previous_ttl / expiry + current_count) + amount <= limit
+            if allowed:
+                self._incr(connection, current_key, 2 * expiry, amount, now)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if allowed:
+            self._after_write(connection)
+        return allowed
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        return self._window_info(self._connection(), key, expiry, time.time())[:4]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
@@ -1,35 +1,132 @@
+import atexit
+import contextvars
+import json
 import logging
-import sys
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+from src.config import settings
+
+# Set per request by RequestIdMiddleware
+request_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+
+class RequestIdFilter(logging.Filter):
+    """Captures the request id on the calling thread, before the record crosses the queue."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Non-blocking front half of the pipeline.
+
+    Records are handed to the listener thread unformatted: message interpolation and all
+    I/O happen off the request path. When the bounded queue is full the record is dropped
+    and counted rather than stalling the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: no need to pre-format/pickle the record (QueueHandler's default)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+def _build_file_handler() -> logging.Handler:
+    if settings.log_rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            settings.log_file, when=settings.log_rotate_when, backupCount=settings.log_backup_count, encoding="utf-8", delay=True
+        )
+    if settings.log_rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            settings.log_file, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count, encoding="utf-8", delay=True
+        )
+    return logging.FileHandler(settings.log_file, encoding="utf-8", delay=True)
+
+
+_listener: logging.handlers.QueueListener | None = None
+queue_handler: DroppingQueueHandler | None = None
+
 
 def setup_logging():
-    # Create logs directory if it doesn't exist
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
+    global _listener, queue_handler
 
     logger = logging.getLogger("app_logger")
-    logger.setLevel(logging.INFO)
+    logger.setLevel(settings.log_level)
 
     # Prevent adding handlers multiple times if function is called repeatedly
     if not logger.handlers:
+        # Create logs directory if it doesn't exist
+        log_dir = os.path.dirname(settings.log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
         # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        formatter = JsonFormatter() if settings.log_format == "json" else logging.Formatter(TEXT_FORMAT)
 
         # File Handler
-        file_handler = logging.FileHandler("logs/app.log")
-        file_handler.setLevel(logging.INFO)
+        file_handler = _build_file_handler()
         file_handler.setFormatter(formatter)
 
         # Console Handler
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Request threads only enqueue; the listener thread formats and writes
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+        queue_handler.addFilter(RequestIdFilter())
+        _listener = logging.handlers.QueueListener(queue_handler.queue, file_handler, console_handler)
+        logger.addHandler(queue_handler)
+        atexit.register(shutdown_logging)
+
+    if _listener is not None and _listener._thread is None:
+        _listener.start()
 
     return logger
 
-logger = setup_logging()
+
+def shutdown_logging():
+    """Flushes queued records and stops the listener thread (called on app shutdown)."""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+# Handlers are attached by setup_logging() at application startup (main.py's lifespan), so
+# importing a module that logs creates no files or threads; until then records of WARNING
+# and above go to stderr through logging's last-resort handler.
+logger = logging.getLogger("app_logger")
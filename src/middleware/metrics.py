@@ -0,0 +1,104 @@
+import time
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.database import UnitOfWork
+from src.instrumentation import StackSampler, metrics, request_queries
+from src.security import ADMIN_ROLE, verify_access_token
+
+
+def _bearer_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            authorization = value.decode("latin-1")
+            return authorization[7:] if authorization[:7].lower() == "bearer " else None
+    return None
+
+
+async def _is_admin(token: str | None) -> bool:
+    # Fully verified (signature, expiry, revocation, current role) before anything is sampled
+    if token is None:
+        return False
+    unit_of_work = UnitOfWork()
+    try:
+        user = await verify_access_token(token, unit_of_work)
+    finally:
+        await unit_of_work.close()
+    return user is not None and (user.role or "").upper() == ADMIN_ROLE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency and SQL statement count per request.
+
+    `?profile=1` from an admin (the bearer token is verified first, like get_current_user does)
+    samples all thread stacks while the request runs, and the response is replaced by the folded
+    stacks, ready for a flamegraph. For anyone else the parameter is ignored and nothing is
+    sampled. Only installed when METRICS_ENABLED is set.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if b"profile" in scope["query_string"] and await self._wants_profile(scope):
+            await self._profile(scope, receive, send)
+            return
+
+        status_code = 500
+        counter = [0]
+        reset = request_queries.set(counter)
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_queries.reset(reset)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.request_seconds.observe(time.perf_counter() - started, scope["method"], route, status_code)
+            metrics.request_queries.observe(counter[0], route)
+
+    @staticmethod
+    async def _wants_profile(scope: Scope) -> bool:
+        if parse_qs(scope["query_string"].decode("latin-1")).get("profile") != ["1"]:
+            return False
+        return await _is_admin(_bearer_token(scope))
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        sampler = StackSampler()
+        if not sampler.start():
+            # Another profile is in progress
+            await self.app(scope, receive, send)
+            return
+
+        async def discard(message: Message) -> None:
+            # The caller gets the profile instead of the response, so nothing is buffered
+            pass
+
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            folded = sampler.stop()
+
+        body = folded.encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"x-profile-samples", str(sum(sampler.samples.values())).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
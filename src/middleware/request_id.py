@@ -0,0 +1,41 @@
+import uuid
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.logging_config import request_id_var
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+class RequestIdMiddleware:
+    """
+    Tags each request with an id (taken from X-Request-ID if the caller sent a sane one)
+    that log records pick up and that is echoed back in the response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                if 0 < len(value) <= 64 and value.isascii():
+                    request_id = value.decode("ascii")
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        token = request_id_var.set(request_id)
+        encoded = request_id.encode("ascii")
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + [(REQUEST_ID_HEADER, encoded)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
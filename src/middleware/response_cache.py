@@ -0,0 +1,180 @@
+import hashlib
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.revocation import revocation_list
+from src.response_cache import CachedResponse, CachePolicy, ResponseCache, response_cache
+from src.token_cache import token_cache
+
+_UNKNOWN = object()
+
+# Validators and caching headers copied onto 304 responses
+NOT_MODIFIED_HEADERS = {b"etag", b"cache-control", b"vary", b"last-modified", b"expires"}
+
+
+def _header(scope: Scope, name: bytes) -> bytes | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _etag_matches(if_none_match: bytes | None, etag: bytes) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == b"*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    weak = etag.removeprefix(b"W/")
+    return any(tag.strip().removeprefix(b"W/") == weak for tag in if_none_match.split(b","))
+
+
+class ResponseCacheMiddleware:
+    """
+    Pure ASGI middleware serving GET routes declared with @cache_response from ResponseCache.
+
+    A hit is answered before routing, so no dependency (DB session, auth) runs and nothing is
+    re-serialized. Routes are learned from the first GET they serve (the router records the
+    matched route in the scope), so that first response is not cached. Every cached response carries an ETag (the app's own, or a hash of the body);
+    a matching If-None-Match is answered with 304. Per-user routes are keyed on the user id of
+    a token get_current_user has already verified (i.e. one in the token cache and not revoked);
+    requests with any other token skip the cache and go through normal authentication.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+        # path -> policy (None: not cacheable); only static paths, so bounded by the route table
+        self._policies: dict[str, CachePolicy | None] = {}
+
+    def _learn(self, scope: Scope):
+        route = scope.get("route")
+        path = getattr(route, "path", None)
+        if path is None or "{" in path:
+            return
+        self._policies[scope["path"]] = getattr(getattr(route, "endpoint", None), "response_cache_policy", None)
+
+    @staticmethod
+    def _user_id(scope: Scope) -> int | None:
+        authorization = (_header(scope, b"authorization") or b"").decode("latin-1")
+        if authorization[:7].lower() != "bearer ":
+            return None
+        cached = token_cache.get(authorization[7:])
+        if cached is None or revocation_list.is_revoked(cached.user.id, cached.claims):
+            return None
+        return cached.user.id
+
+    @staticmethod
+    def _key(scope: Scope, policy: CachePolicy, user_id: int | None) -> str:
+        parts = [scope["path"], scope["query_string"].decode("latin-1")]
+        if policy.vary_user:
+            parts.append(f"user:{user_id}")
+        for name in policy.vary_headers:
+            parts.append((_header(scope, name.encode("latin-1")) or b"").decode("latin-1"))
+        return "\x00".join(parts)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        policy = self._policies.get(scope["path"], _UNKNOWN)
+        if policy is _UNKNOWN:
+            await self.app(scope, receive, send)
+            self._learn(scope)
+            return
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        user_id = None
+        if policy.vary_user:
+            user_id = self._user_id(scope)
+            if user_id is None:
+                # Unknown or unverified token: authenticate normally; the response is cached
+                # below if get_current_user accepted the token
+                await self._fill(scope, receive, send, policy, None)
+                return
+
+        key = self._key(scope, policy, user_id)
+        entry = self.cache.get(key)
+        if entry is not None:
+            await self._send_entry(scope, send, entry)
+            return
+        await self._fill(scope, receive, send, policy, key)
+
+    async def _send_entry(self, scope: Scope, send: Send, entry: CachedResponse):
+        if _etag_matches(_header(scope, b"if-none-match"), entry.etag):
+            headers = [(name, value) for name, value in entry.headers if name in NOT_MODIFIED_HEADERS]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": entry.status, "headers": entry.headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def _fill(self, scope: Scope, receive: Receive, send: Send, policy: CachePolicy, key: str | None):
+        start: Message | None = None
+        chunks: list[bytes] = []
+        size = 0
+        passthrough = False
+        # An invalidation while the handler runs may mean it read stale data: don't store that
+        generation = self.cache.generation
+
+        async def capture(message: Message) -> None:
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                headers = message.get("headers") or []
+                if message["status"] != 200 or any(name.lower() == b"set-cookie" for name, _ in headers):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > settings.response_cache_max_entry_bytes:
+                # Too large to cache: flush what we buffered and stream the rest
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": message.get("more_body", False)})
+            elif not message.get("more_body", False):
+                await self._complete(scope, send, policy, key, start, b"".join(chunks), generation)
+
+        await self.app(scope, receive, capture)
+
+    async def _complete(self, scope: Scope, send: Send, policy: CachePolicy, key: str | None,
+                        start: Message, body: bytes, generation: int):
+        headers = [(name.lower(), value) for name, value in start.get("headers") or []]
+        names = {name for name, _ in headers}
+        etag = next((value for name, value in headers if name == b"etag"), None)
+        if etag is None:
+            etag = b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode("ascii") + b'"'
+            headers.append((b"etag", etag))
+        if b"cache-control" not in names:
+            visibility = b"private" if policy.vary_user else b"public"
+            directive = b"max-age=%d" % policy.max_age if policy.max_age else b"no-cache"
+            headers.append((b"cache-control", visibility + b", " + directive))
+        vary = ([b"authorization"] if policy.vary_user else []) + [name.encode("latin-1") for name in policy.vary_headers]
+        if vary:
+            headers.append((b"vary", b", ".join(vary)))
+
+        tags = set(policy.tags)
+        if policy.vary_user:
+            # Re-read after the handler: a token get_current_user just verified is now cached
+            user_id = self._user_id(scope)
+            key = self._key(scope, policy, user_id) if user_id is not None else None
+            tags.add(f"user:{user_id}")
+
+        entry = CachedResponse(
+            status=start["status"], headers=headers, body=body, etag=etag,
+            expires_at=time.monotonic() + policy.ttl_seconds, tags=frozenset(tags),
+        )
+        if key is not None:
+            self.cache.set(key, entry, generation)
+        await self._send_entry(scope, send, entry)
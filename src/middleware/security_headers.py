@@ -1,20 +1,86 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-        
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        # Basic CSP: Allow self, allow inline scripts/styles (often needed for React/Next.js dev), 
-        # but in a stricter prod env, inline should be avoided or used with nonces.
-        # Allowing 'unsafe-inline' for style/script to ensure Next.js dev mode works smoothly without complex nonce setup for this lab.
-        response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline'; img-src 'self' data:;"
-        response.headers["Referrer-Policy"] = "no-referrer"
-        
-        # HSTS - Apply if the request is HTTPS or if we assume production runs behind an HTTPS proxy.
-        # For local development on HTTP, this is usually ignored by browsers, but good to have.
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        return response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    # Basic CSP: Allow self, allow inline scripts/styles (often needed for React/Next.js dev),
+    # but in a stricter prod env, inline should be avoided or used with nonces.
+    # Allowing 'unsafe-inline' for style/script to ensure Next.js dev mode works smoothly without complex nonce setup for this lab.
+    "Content-Security-Policy": "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline'; img-src 'self' data:;",
+    "Referrer-Policy": "no-referrer",
+    # HSTS - Apply if the request is HTTPS or if we assume production runs behind an HTTPS proxy.
+    # For local development on HTTP, this is usually ignored by browsers, but good to have.
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+}
+
+# Swagger UI / ReDoc load their bundles, fonts and favicon from CDNs
+DOCS_CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://fonts.googleapis.com; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "img-src 'self' data: https://fastapi.tiangolo.com https://cdn.redoc.ly; "
+    "worker-src 'self' blob:;"
+)
+
+DEFAULT_PATH_OVERRIDES = {
+    "/docs": {"Content-Security-Policy": DOCS_CONTENT_SECURITY_POLICY},
+    "/redoc": {"Content-Security-Policy": DOCS_CONTENT_SECURITY_POLICY},
+}
+
+def _encode(headers: dict[str, str]) -> list[tuple[bytes, bytes]]:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+class SecurityHeadersMiddleware:
+    """
+    Pure ASGI middleware adding security headers to every HTTP response.
+
+    Header lists are encoded once at startup and appended to the `http.response.start`
+    message, so there is no per-request task, memory stream or header rebuilding, and
+    streaming responses pass through untouched. `path_overrides` maps a path prefix to
+    header values replacing (or, with None, removing) the defaults for that path and everything
+    below it.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        headers: dict[str, str] | None = None,
+        path_overrides: dict[str, dict[str, str | None]] | None = None,
+    ):
+        self.app = app
+        base = dict(DEFAULT_SECURITY_HEADERS if headers is None else headers)
+        self._default = _encode(base)
+        overrides = DEFAULT_PATH_OVERRIDES if path_overrides is None else path_overrides
+        # Longest prefix first so the most specific override wins
+        self._overrides = [
+            (prefix, _encode({name: value for name, value in {**base, **override}.items() if value is not None}))
+            for prefix, override in sorted(overrides.items(), key=lambda item: len(item[0]), reverse=True)
+        ]
+        self._names = {name for name, _ in self._default}
+        for _, encoded in self._overrides:
+            self._names.update(name for name, _ in encoded)
+
+    def _headers_for(self, path: str) -> list[tuple[bytes, bytes]]:
+        for prefix, encoded in self._overrides:
+            # Whole path segments only: the /docs override must not cover /docs-evil
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return encoded
+        return self._default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        security_headers = self._headers_for(scope["path"])
+        names = self._names
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Same semantics as before: our values replace any the app already set
+                existing = message.get("headers") or []
+                message["headers"] = [h for h in existing if h[0].lower() not in names] + security_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
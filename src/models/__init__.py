@@ -1,2 +1,3 @@
 from src.models.user import User
 from src.models.token import RefreshToken
+from src.models.revocation import RevocationEvent
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from src.database import Base
+
+class RevocationEvent(Base):
+    """
+    Append-only log of access-token revocations, polled by every worker (see RevocationBus).
+    Either `issued_before` (every token of the user issued at or before it) or `jti` (one token).
+    """
+    __tablename__ = "revocation_events"
+    # Workers poll `id > last seen`, so ids must never be reused, even once the reaper has emptied
+    # the table (a plain SQLite rowid restarts at max(id) + 1)
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    jti = Column(String, nullable=True)
+    issued_before = Column(Float, nullable=True)  # JWT NumericDate, compared with `iat`
+    # Once every token the event covers has expired, it no longer matters and can be deleted
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
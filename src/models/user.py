@@ -1,6 +1,17 @@
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from src.database import Base
 
+def normalize_login_key(value: str | None) -> str | None:
+    """Login identifiers are matched case-insensitively through their lowercased key."""
+    return value.lower() if value is not None else None
+
+def _login_key_from(column: str):
+    # Column default computed from the inserted row, so ORM and Core (bulk) inserts both fill it
+    def default(context):
+        return normalize_login_key(context.get_current_parameters().get(column))
+    return default
+
 class User(Base):
     __tablename__ = "users"
 
@@ -8,4 +19,14 @@ class User(Base):
     username = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     password = Column(String)
+    # Normalized copies of email/username. Their unique indexes serve every login lookup
+    # (covering: SQLite stores the rowid/id in each index entry) and enforce case-insensitive uniqueness.
+    email_key = Column(String, unique=True, index=True, default=_login_key_from("email"))
+    username_key = Column(String, unique=True, index=True, default=_login_key_from("username"))
     role = Column(String, default="USER")
+    score = Column(Integer, default=0, server_default="0", nullable=False)
+    # Bumped on every insert/update; MAX(updated_at) versions the leaderboard for ETag/Last-Modified
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+# Ranked index: serves "ORDER BY score DESC, id" for top-K pages and rank counts
+Index("ix_users_score_desc_id", User.score.desc(), User.id)
@@ -0,0 +1,284 @@
+import asyncio
+import functools
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import TYPE_CHECKING
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# passlib (and its bcrypt backend detection) is imported on first use, not with the app
+
+CALIBRATION_PROBE_ROUNDS = 8
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full. Mapped to 503 in main.py."""
+
+
+@dataclass(frozen=True)
+class HashPolicy:
+    """Parameters for new hashes. Existing hashes below them are reported by needs_update()."""
+    scheme: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = settings.argon2_time_cost
+    argon2_memory_cost_kb: int = settings.argon2_memory_cost_kb
+    argon2_parallelism: int = settings.argon2_parallelism
+    calibrated: bool = False
+
+    def context(self) -> "CryptContext":
+        from passlib.context import CryptContext
+
+        if self.scheme not in ("bcrypt", "argon2"):
+            raise ValueError(f"Unsupported PASSWORD_HASH_SCHEME {self.scheme!r}")
+        # min_rounds (not rounds, which also caps them): stronger hashes than ours are left alone
+        return CryptContext(
+            schemes=["bcrypt", "argon2"],
+            default=self.scheme,
+            deprecated=[scheme for scheme in ("bcrypt", "argon2") if scheme != self.scheme],
+            bcrypt__default_rounds=self.bcrypt_rounds,
+            bcrypt__min_rounds=self.bcrypt_rounds,
+            argon2__type="ID",
+            argon2__default_rounds=self.argon2_time_cost,
+            argon2__min_rounds=self.argon2_time_cost,
+            argon2__memory_cost=self.argon2_memory_cost_kb,
+            argon2__parallelism=self.argon2_parallelism,
+        )
+
+
+def calibrate_bcrypt_rounds(target_ms: float = settings.password_hash_target_ms,
+                            min_rounds: int = settings.bcrypt_min_rounds,
+                            max_rounds: int = settings.bcrypt_max_rounds) -> int:
+    """Highest cost whose hash fits in target_ms here; each extra round doubles the work."""
+    from passlib.hash import bcrypt
+
+    probe = bcrypt.using(rounds=CALIBRATION_PROBE_ROUNDS)
+    samples = []
+    for _ in range(3):
+        start = time.perf_counter()
+        probe.hash("calibration")
+        samples.append(time.perf_counter() - start)
+    probe_ms = min(samples) * 1000
+    rounds = CALIBRATION_PROBE_ROUNDS + math.floor(math.log2(max(target_ms / probe_ms, 1e-9)))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+def load_policy() -> HashPolicy:
+    if settings.password_hash_scheme == "argon2":
+        from passlib.hash import argon2
+
+        if not argon2.has_backend():
+            raise RuntimeError("PASSWORD_HASH_SCHEME=argon2 requires the argon2-cffi package")
+    if settings.bcrypt_rounds == "auto":
+        return HashPolicy(settings.password_hash_scheme, calibrate_bcrypt_rounds(), calibrated=True)
+    return HashPolicy(settings.password_hash_scheme, int(settings.bcrypt_rounds))
+
+
+def hash_settings(hashed_password: str) -> str:
+    """The part of a hash before its salt: scheme and cost parameters, e.g. "$2b$12"."""
+    if hashed_password.startswith("$2"):
+        return hashed_password[:6]
+    if hashed_password.startswith("$argon2"):
+        return hashed_password.rsplit("$", 2)[0]
+    return "unknown"
+
+
+# --- Worker functions (executed inside the pool processes) ---
+@functools.lru_cache(maxsize=4)
+def _context_for(policy: HashPolicy) -> "CryptContext":
+    return policy.context()
+
+
+def _hash_job(policy: HashPolicy, password: str):
+    start = time.perf_counter()
+    hashed = _context_for(policy).hash(password)
+    return hashed, time.perf_counter() - start
+
+
+def _verify_job(policy: HashPolicy, plain_password: str, hashed_password: str):
+    start = time.perf_counter()
+    valid = _context_for(policy).verify(plain_password, hashed_password)
+    return valid, time.perf_counter() - start
+
+
+class HashMetrics:
+    """Counters separating time spent queued from time spent hashing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.hash_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.hash_seconds_max = 0.0
+        self.rehashed = 0
+
+    def record(self, wait_seconds: float, hash_seconds: float):
+        with self._lock:
+            self.completed += 1
+            self.wait_seconds_total += wait_seconds
+            self.hash_seconds_total += hash_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            self.hash_seconds_max = max(self.hash_seconds_max, hash_seconds)
+
+    def record_rejection(self):
+        with self._lock:
+            self.rejected += 1
+
+    def record_rehash(self):
+        with self._lock:
+            self.rehashed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "wait_seconds_total": self.wait_seconds_total,
+                "hash_seconds_total": self.hash_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / completed,
+                "hash_seconds_avg": self.hash_seconds_total / completed,
+                "wait_seconds_max": self.wait_seconds_max,
+                "hash_seconds_max": self.hash_seconds_max,
+            }
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated process pool so hashing neither holds request
+    threads busy on CPU nor competes with them for the GIL.
+
+    The number of queued + running jobs is bounded; once the limit is reached new
+    jobs fail immediately with PasswordHasherBusy instead of piling up.
+    """
+
+    def __init__(self, workers: int = settings.password_hash_workers, max_pending: int | None = settings.password_hash_max_pending,
+                 policy: HashPolicy | None = None):
+        self.workers = workers
+        self.max_pending = max_pending if max_pending is not None else max(workers, 1) * 8
+        self.metrics = HashMetrics()
+        self._policy = policy
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def policy(self) -> HashPolicy:
+        # Resolved (and, with BCRYPT_ROUNDS=auto, calibrated) on first use or at startup;
+        # jobs carry it to the pool processes so every worker hashes with the same cost.
+        if self._policy is None:
+            with self._lock:
+                if self._policy is None:
+                    self._policy = load_policy()
+        return self._policy
+
+    def needs_update(self, hashed_password: str) -> bool:
+        """True if the hash uses another scheme or weaker parameters than the policy (no hashing)."""
+        return _context_for(self.policy).needs_update(hashed_password)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # The pool is created lazily and per process, so forked server workers never share one.
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.metrics.record_rejection()
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += 1
+
+    def _release_slot(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, job, *args) -> Future:
+        """Submits a job and returns a future resolving to the job's result."""
+        self._reserve_slot()
+        submitted_at = time.perf_counter()
+        outer: Future = Future()
+
+        def _done(inner: Future):
+            self._release_slot()
+            try:
+                result, hash_seconds = inner.result()
+            except BaseException as exc:
+                outer.set_exception(exc)
+                return
+            elapsed = time.perf_counter() - submitted_at
+            self.metrics.record(max(elapsed - hash_seconds, 0.0), hash_seconds)
+            outer.set_result(result)
+
+        if self.workers <= 0:
+            inner: Future = Future()
+            try:
+                inner.set_result(job(*args))
+            except BaseException as exc:
+                inner.set_exception(exc)
+            _done(inner)
+        else:
+            try:
+                self._get_executor().submit(job, *args).add_done_callback(_done)
+            except BaseException:
+                self._release_slot()
+                raise
+        return outer
+
+    # --- Sync API (blocks the calling thread, but the CPU work happens elsewhere) ---
+    def hash(self, password: str) -> str:
+        return self._submit(_hash_job, self.policy, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(_verify_job, self.policy, plain_password, hashed_password).result()
+
+    # --- Async API ---
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash_job, self.policy, password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(_verify_job, self.policy, plain_password, hashed_password))
+
+    # --- Bulk API (offline jobs such as the user import CLI) ---
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hashes a whole batch across every pool worker. Not bounded by max_pending."""
+        if self.workers <= 0:
+            return [_hash_job(self.policy, password)[0] for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        jobs = self._get_executor().map(_hash_job, repeat(self.policy), passwords, chunksize=chunksize)
+        return [hashed for hashed, _ in jobs]
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            self._executor_pid = None
+
+
+password_hasher = PasswordHasher()
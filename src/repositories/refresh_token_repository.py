@@ -0,0 +1,74 @@
+from datetime import datetime
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from src.models.token import RefreshToken
+
+# Statements only; the caller (RefreshTokenStore) owns the transaction and commits once
+class AsyncRefreshTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_by_token(self, token: str) -> RefreshToken | None:
+        result = await self.db.execute(select(RefreshToken).where(RefreshToken.token == token).limit(1))
+        return result.scalars().first()
+
+    async def find_with_user(self, token: str) -> RefreshToken | None:
+        """Same, with RefreshToken.user loaded by the same query."""
+        result = await self.db.execute(
+            select(RefreshToken).options(joinedload(RefreshToken.user)).where(RefreshToken.token == token).limit(1)
+        )
+        return result.scalars().first()
+
+    async def add(self, token: str, user_id: int, expires_at: datetime) -> None:
+        await self.db.execute(
+            insert(RefreshToken).values(
+                token=token, user_id=user_id, expires_at=expires_at, revoked=False, created_at=datetime.utcnow()
+            )
+        )
+
+    async def rotate(self, old_token: str, new_token: str, user_id: int, expires_at: datetime) -> bool:
+        """Deletes the old token and inserts its replacement. False if the old token was already used or revoked."""
+        result = await self.db.execute(
+            delete(RefreshToken).where(RefreshToken.token == old_token, RefreshToken.revoked.is_(False))
+        )
+        if result.rowcount != 1:
+            return False
+        await self.add(new_token, user_id, expires_at)
+        return True
+
+    async def revoke(self, token: str) -> int | None:
+        """Marks the token revoked and returns its user id (None if unknown)."""
+        user_id = (
+            await self.db.execute(select(RefreshToken.user_id).where(RefreshToken.token == token))
+        ).scalar()
+        if user_id is None:
+            return None
+        await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token == token, RefreshToken.revoked.is_(False))
+            .values(revoked=True, revoked_at=datetime.utcnow())
+        )
+        return user_id
+
+    async def revoke_all_for_user(self, user_id: int) -> int:
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+            .values(revoked=True, revoked_at=datetime.utcnow())
+        )
+        return result.rowcount
+
+    # --- Cleanup (used by the reaper, one bounded batch per call) ---
+    async def delete_expired(self, now: datetime, limit: int) -> int:
+        # Revoked tokens are kept for the audit retention period (delete_revoked_before), even once expired
+        batch = select(RefreshToken.id).where(RefreshToken.expires_at < now, RefreshToken.revoked.is_(False)).limit(limit)
+        result = await self.db.execute(delete(RefreshToken).where(RefreshToken.id.in_(batch)))
+        return result.rowcount
+
+    async def delete_revoked_before(self, cutoff: datetime, limit: int) -> int:
+        batch = select(RefreshToken.id).where(
+            RefreshToken.revoked.is_(True), RefreshToken.revoked_at < cutoff
+        ).limit(limit)
+        result = await self.db.execute(delete(RefreshToken).where(RefreshToken.id.in_(batch)))
+        return result.rowcount
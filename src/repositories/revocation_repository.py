@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models.revocation import RevocationEvent
+
+# Statements only; the caller (RevocationBus or the reaper) commits
+class AsyncRevocationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, user_id: int | None, jti: str | None, issued_before: float | None, expires_at: datetime) -> None:
+        await self.db.execute(
+            insert(RevocationEvent).values(
+                user_id=user_id, jti=jti, issued_before=issued_before, expires_at=expires_at, created_at=datetime.utcnow()
+            )
+        )
+
+    async def find_after(self, last_id: int, limit: int) -> list[RevocationEvent]:
+        """Events newer than last_id, oldest first (a primary-key range scan)."""
+        result = await self.db.execute(
+            select(RevocationEvent).where(RevocationEvent.id > last_id).order_by(RevocationEvent.id).limit(limit)
+        )
+        return list(result.scalars())
+
+    async def find_active(self, now: datetime) -> list[RevocationEvent]:
+        result = await self.db.execute(
+            select(RevocationEvent).where(RevocationEvent.expires_at > now).order_by(RevocationEvent.id)
+        )
+        return list(result.scalars())
+
+    async def last_id(self) -> int:
+        return (await self.db.execute(select(func.max(RevocationEvent.id)))).scalar() or 0
+
+    # --- Cleanup (used by the reaper, one bounded batch per call) ---
+    async def delete_expired(self, now: datetime, limit: int) -> int:
+        batch = select(RevocationEvent.id).where(RevocationEvent.expires_at < now).limit(limit)
+        result = await self.db.execute(delete(RevocationEvent).where(RevocationEvent.id.in_(batch)))
+        return result.rowcount
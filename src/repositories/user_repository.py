@@ -1,26 +1,237 @@
+import importlib
+from datetime import datetime
+from typing import Iterator
+from sqlalchemy import and_, func, literal, or_, select, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.models.user import User
+from src.models.user import User, normalize_login_key
+from src.token_cache import token_cache
+from src.response_cache import response_cache
+from src.instrumentation import timed_methods
+
+def _identifier_lookup(identifier: str):
+    """
+    One statement, two index seeks: each branch of the UNION ALL is answered from the unique
+    index on email_key / username_key alone, then the matching row is fetched by primary key.
+    (`email = ? OR username = ?` often degrades to a full table scan in SQLite.)
+    An email match wins over a username match.
+    """
+    key = normalize_login_key(identifier)
+    matches = union_all(
+        select(User.id.label("id"), literal(0).label("priority")).where(User.email_key == key),
+        select(User.id.label("id"), literal(1).label("priority")).where(User.username_key == key),
+    ).subquery()
+    return select(User).join(matches, User.id == matches.c.id).order_by(matches.c.priority).limit(1)
+
+def _ranked_after(after: tuple[int, int] | None, limit: int | None):
+    """
+    Leaderboard rows following the (score, id) keyset cursor. Unlike OFFSET, the index seek
+    costs the same on page 1 and page 10,000.
+    """
+    statement = select(User.id, User.username, User.score).order_by(User.score.desc(), User.id)
+    if after is not None:
+        score, user_id = after
+        statement = statement.where(or_(User.score < score, and_(User.score == score, User.id > user_id)))
+    return statement.limit(limit)
+
+def _users_after(after_id: int | None, limit: int | None):
+    statement = select(User.id, User.username, User.email, User.role, User.score, User.updated_at).order_by(User.id)
+    if after_id is not None:
+        statement = statement.where(User.id > after_id)
+    return statement.limit(limit)
 
 # Equivalent to Spring Boot's @Repository (e.g., JpaRepository<User, Long>)
+@timed_methods("user_repository")
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
     # Equivalent to save(User user)
+    # Raises IntegrityError (after rolling back) when the email or username is taken
     def save(self, user: User) -> User:
         self.db.add(user)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
         self.db.refresh(user)
+        # Cached identities and responses for this user may now be stale
+        token_cache.invalidate_user(user.id)
+        response_cache.invalidate_tags((f"user:{user.id}", "leaderboard"))
         return user
 
     # Equivalent to findByEmail(String email)
     def find_by_email(self, email: str) -> User | None:
-        return self.db.query(User).filter(User.email == email).first()
+        return self.db.query(User).filter(User.email_key == normalize_login_key(email)).first()
 
     def find_by_username(self, username: str) -> User | None:
-        return self.db.query(User).filter(User.username == username).first()
+        return self.db.query(User).filter(User.username_key == normalize_login_key(username)).first()
 
     def find_by_identifier(self, identifier: str) -> User | None:
-        return self.db.query(User).filter(
-            (User.email == identifier) | (User.username == identifier)
-        ).first()
+        return self.db.scalars(_identifier_lookup(identifier)).first()
+
+    # --- Leaderboard queries (served by ix_users_score_desc_id) ---
+    def find_ranked(self, offset: int, limit: int):
+        return self.db.query(User.id, User.username, User.score).order_by(
+            User.score.desc(), User.id
+        ).offset(offset).limit(limit).all()
+
+    def count_ranked_before(self, score: int, user_id: int) -> int:
+        """Number of users ranked ahead of (score, user_id)."""
+        return self.db.query(func.count(User.id)).filter(
+            or_(User.score > score, and_(User.score == score, User.id < user_id))
+        ).scalar()
+
+    def last_modified(self) -> datetime | None:
+        return self.db.query(func.max(User.updated_at)).scalar()
+
+    def add_score(self, user_id: int, points: int) -> None:
+        # Atomic increment; the ranked index is maintained by the database
+        self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(score=User.score + points, updated_at=datetime.utcnow())
+        )
+        self.db.commit()
+        response_cache.invalidate_tags(("leaderboard",))
+
+    # --- Bulk operations (user import/export CLI) ---
+    def insert_many(self, rows: list[dict]) -> int:
+        """
+        Inserts a batch with one executemany in one transaction. Rows whose email or username
+        is already taken (in the table or earlier in the batch) are skipped via ON CONFLICT DO
+        NOTHING. Returns the number of rows inserted.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in ("sqlite", "postgresql"):
+            raise NotImplementedError(f"Bulk insert is not supported on {dialect}")
+        # Only the CLI needs the dialect-specific insert; the app never imports the postgresql dialect
+        statement = importlib.import_module(f"sqlalchemy.dialects.{dialect}").insert(User.__table__).on_conflict_do_nothing()
+        inserted = self.db.execute(statement, rows).rowcount
+        self.db.commit()
+        response_cache.invalidate_tags(("leaderboard",))
+        return inserted
+
+    def stream_all(self, batch_size: int = 1000, after_id: int | None = None, limit: int | None = None) -> Iterator:
+        """Yields users in id order after `after_id`, fetching `batch_size` rows at a time (server-side cursor)."""
+        result = self.db.execute(_users_after(after_id, limit).execution_options(yield_per=batch_size))
+        for row in result:
+            yield row
+
+    def stream_ranked(self, after: tuple[int, int] | None = None, limit: int | None = None,
+                      batch_size: int = 1000) -> Iterator:
+        result = self.db.execute(_ranked_after(after, limit).execution_options(yield_per=batch_size))
+        for row in result:
+            yield row
+
+
+# Async variant of UserRepository (same queries, awaited on an AsyncSession)
+@timed_methods("user_repository")
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def save(self, user: User) -> User:
+        self.db.add(user)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise
+        # No refresh: sessions keep attributes after commit and the id comes back from the INSERT
+        token_cache.invalidate_user(user.id)
+        response_cache.invalidate_tags((f"user:{user.id}", "leaderboard"))
+        return user
+
+    async def find_by_id(self, user_id: int) -> User | None:
+        return await self.db.get(User, user_id)
+
+    async def find_by_email(self, email: str) -> User | None:
+        result = await self.db.execute(select(User).where(User.email_key == normalize_login_key(email)).limit(1))
+        return result.scalars().first()
+
+    async def find_by_username(self, username: str) -> User | None:
+        result = await self.db.execute(
+            select(User).where(User.username_key == normalize_login_key(username)).limit(1)
+        )
+        return result.scalars().first()
+
+    async def find_by_identifier(self, identifier: str) -> User | None:
+        result = await self.db.execute(_identifier_lookup(identifier))
+        return result.scalars().first()
+
+    async def find_ranked(self, offset: int, limit: int):
+        result = await self.db.execute(
+            select(User.id, User.username, User.score)
+            .order_by(User.score.desc(), User.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def count_ranked_before(self, score: int, user_id: int) -> int:
+        result = await self.db.execute(
+            select(func.count(User.id)).where(
+                or_(User.score > score, and_(User.score == score, User.id < user_id))
+            )
+        )
+        return result.scalar_one()
+
+    async def last_modified(self) -> datetime | None:
+        result = await self.db.execute(select(func.max(User.updated_at)))
+        return result.scalar()
+
+    async def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Swaps the hash only if it is still old_hash (a concurrent password change wins)."""
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            # Keep updated_at: it versions the leaderboard, which a new hash does not change
+            .values(password=new_hash, updated_at=User.updated_at)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def _keyset_batches(self, query, key_of, after, limit: int | None, batch_size: int):
+        """
+        Yields the rows of query(after, size) one short keyset query per batch. The read
+        transaction ends before each batch is handed out, so a slow consumer holds neither a
+        pooled connection nor a WAL snapshot between batches. Rows are not read from a single
+        snapshot: a row updated mid-stream may show up twice or not at all.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            rows = (await self.db.execute(query(after, size))).all()
+            await self.db.commit()  # read-only: just returns the connection
+            for row in rows:
+                yield row
+            if len(rows) < size:
+                return
+            after = key_of(rows[-1])
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def stream_all(self, batch_size: int = 1000, after_id: int | None = None, limit: int | None = None):
+        return self._keyset_batches(_users_after, lambda row: row.id, after_id, limit, batch_size)
+
+    def stream_ranked(self, after: tuple[int, int] | None = None, limit: int | None = None,
+                      batch_size: int = 1000):
+        return self._keyset_batches(_ranked_after, lambda row: (row.score, row.id), after, limit, batch_size)
+
+    async def stream_password_hashes(self, batch_size: int = 1000):
+        result = await self.db.stream(select(User.password).execution_options(yield_per=batch_size))
+        async for partition in result.scalars().partitions():
+            for password_hash in partition:
+                yield password_hash
+
+    async def add_score(self, user_id: int, points: int) -> None:
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(score=User.score + points, updated_at=datetime.utcnow())
+        )
+        await self.db.commit()
+        response_cache.invalidate_tags(("leaderboard",))
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from src.config import settings
+
+ENTRY_OVERHEAD_BYTES = 256
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl_seconds: float
+    vary_user: bool = False                     # key on the verified user id (requires a bearer token)
+    vary_headers: tuple[str, ...] = ()          # request headers that change the response
+    tags: tuple[str, ...] = ()                  # invalidation groups, e.g. "leaderboard"
+    max_age: int = 0                            # client max-age; 0 = revalidate every time (ETag -> 304)
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    etag: bytes
+    expires_at: float
+    tags: frozenset = field(default_factory=frozenset)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers) + ENTRY_OVERHEAD_BYTES
+
+
+def cache_response(ttl_seconds: float, vary_user: bool = False, vary_headers: tuple[str, ...] = (),
+                   tags: tuple[str, ...] = (), max_age: int = 0):
+    """
+    Declares a GET route cacheable by ResponseCacheMiddleware (the endpoint itself is unchanged):
+
+        @router.get("/leaderboard")
+        @cache_response(ttl_seconds=5, tags=("leaderboard",))
+        async def get_leaderboard(...): ...
+    """
+    policy = CachePolicy(ttl_seconds, vary_user, tuple(h.lower() for h in vary_headers), tags, max_age)
+
+    def decorator(endpoint):
+        endpoint.response_cache_policy = policy
+        return endpoint
+
+    return decorator
+
+
+class ResponseCache:
+    """
+    In-process LRU of rendered responses, bounded by total bytes and per-entry TTL.
+
+    Entries carry tags so writers can drop every response derived from some data
+    (`invalidate_tags(["user:42"])`) without knowing the cache keys. Another backend (e.g.
+    one shared by all workers) only needs the same get/set/invalidate_tags/clear methods.
+    """
+
+    def __init__(self, max_bytes: int = settings.response_cache_max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # bumped by every invalidation
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._by_tag: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, entry: CachedResponse, generation: int | None = None):
+        """Stores the entry unless it is too large or an invalidation happened since `generation`."""
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.size += entry.size
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in self._by_tag.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._by_tag.clear()
+            self.size = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+response_cache = ResponseCache()
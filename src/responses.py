@@ -0,0 +1,41 @@
+import importlib.util
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+# orjson when installed (several times faster on large lists), else pydantic-core's encoder,
+# which FastAPI already depends on. Both write compact UTF-8 straight to bytes.
+JSON_ENCODER = "orjson" if importlib.util.find_spec("orjson") else "pydantic-core"
+
+if JSON_ENCODER == "orjson":
+    import orjson
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=pydantic_core.to_jsonable_python)
+else:
+    def dumps(content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The app's default response class (like a Jackson message converter in Spring): renders
+    with `dumps` instead of json.dumps. Handlers returning plain lists/dicts (e.g. the
+    leaderboard) should return it directly, which also skips FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_response(model: type[BaseModel], source: Any, status_code: int = 200, headers: dict | None = None) -> Response:
+    """
+    Serializes `source` (an ORM row, a cached snapshot...) through `model` without validating it.
+
+    For data the app produced itself, FastAPI's response_model handling would re-validate every
+    field only to dump it again. Keep response_model on the route for the OpenAPI schema.
+    """
+    instance = model.model_construct(**{name: getattr(source, name) for name in model.model_fields})
+    return Response(pydantic_core.to_json(instance), status_code=status_code, headers=headers, media_type="application/json")
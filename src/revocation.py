@@ -0,0 +1,54 @@
+import time
+
+
+class RevocationList:
+    """
+    Access tokens revoked before they expire, checked on every authenticated request in O(1)
+    and without a query:
+
+    - a per-user watermark: every token of the user issued at or before it (`iat`) is invalid
+      (logout everywhere);
+    - a deny-set of single token ids (`jti`), e.g. the token presented at logout.
+
+    Entries are forgotten once every token they cover has expired. Filled by RevocationBus
+    (src/services/revocation_bus.py), which keeps the copies in all workers in step.
+    """
+
+    def __init__(self):
+        self._watermarks: dict[int, tuple[float, float]] = {}  # user id -> (issued_before, forget_at)
+        self._denied: dict[str, float] = {}  # jti -> forget_at
+
+    def __len__(self) -> int:
+        return len(self._watermarks) + len(self._denied)
+
+    def revoke_user(self, user_id: int, issued_before: float, forget_at: float):
+        current = self._watermarks.get(user_id)
+        if current is None or current[0] < issued_before:
+            self._watermarks[user_id] = (issued_before, forget_at)
+
+    def revoke_token(self, jti: str, forget_at: float):
+        self._denied[jti] = max(forget_at, self._denied.get(jti, 0.0))
+
+    def is_revoked(self, user_id: int, claims: dict) -> bool:
+        jti = claims.get("jti")
+        if jti is not None and jti in self._denied:
+            return True
+        watermark = self._watermarks.get(user_id)
+        # Tokens minted before iat/jti existed count as issued at 0: any watermark covers them
+        return watermark is not None and claims.get("iat", 0) <= watermark[0]
+
+    def prune(self, now: float | None = None):
+        now = time.time() if now is None else now
+        for user_id, (_, forget_at) in list(self._watermarks.items()):
+            if forget_at <= now:
+                del self._watermarks[user_id]
+        for jti, forget_at in list(self._denied.items()):
+            if forget_at <= now:
+                del self._denied[jti]
+
+    def clear(self):
+        self._watermarks.clear()
+        self._denied.clear()
+
+
+revocation_list = RevocationList()
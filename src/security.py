@@ -1,68 +1,101 @@
-import os
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
 
-from src.database import get_db
-from src.repositories.user_repository import UserRepository
-from src.models.user import User
-
-load_dotenv()
+from src.database import UnitOfWork, get_unit_of_work
+from src.instrumentation import timed, timer
+from src.repositories.user_repository import AsyncUserRepository
+from src.password_hasher import password_hasher
+from src.revocation import revocation_list
+from src.token_cache import UserSnapshot, token_cache
+from src.tokens import TokenError, token_codec
 
 # --- Configuration ---
-SECRET_KEY = os.getenv("SECRET_KEY", "fallback_secret_key_for_dev_only_12345")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
+# Signing keys (SECRET_KEY/ALGORITHM or the JWT_KEYS keyring) are configured in src/tokens.py
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+ADMIN_ROLE = "ADMIN"
 
 # --- Password Hashing ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+# bcrypt runs on a dedicated process pool (see src/password_hasher.py)
+@timed("verify_password")
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+@timed("verify_password")
+async def verify_password_async(plain_password, hashed_password):
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await password_hasher.hash_async(password)
 
 # --- JWT Token Handling ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# Same, but a missing Authorization header yields None instead of 401 (e.g. logout)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
+@timed("create_access_token")
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # iat (sub-second, so a revocation never catches a token issued right after it) and jti make
+    # the token revocable before exp; see src/revocation.py
+    to_encode.update({"exp": expire, "iat": round(time.time(), 6), "jti": secrets.token_urlsafe(12)})
+    encoded_jwt = token_codec.encode(to_encode)
     return encoded_jwt
 
 def create_refresh_token():
     return secrets.token_hex(32)
 
 # --- Current User Dependency ---
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def verify_access_token(token: str, unit_of_work: UnitOfWork) -> UserSnapshot | None:
+    """The user a valid, unrevoked access token belongs to, or None."""
+    # Fast path: token already verified recently (no JWT decode, no DB query); revocation is an
+    # in-memory lookup on both paths
+    cached = token_cache.get(token)
+    if cached is not None:
+        return None if revocation_list.is_revoked(cached.user.id, cached.claims) else cached.user
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        with timer("jwt.decode"):
+            payload = token_codec.decode(token)
+    except TokenError:
+        return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+
+    # Only a cache miss opens the request's session (shared with the handler)
+    user_repo = AsyncUserRepository(unit_of_work.session)
+    user = await user_repo.find_by_email(email=email)
+    if user is None or revocation_list.is_revoked(user.id, payload):
+        return None
 
-    user_repo = UserRepository(db)
-    user = user_repo.find_by_email(email=email)
+    snapshot = UserSnapshot.from_user(user)
+    token_cache.put(token, payload, snapshot)
+    return snapshot
+
+async def get_current_user(token: str = Depends(oauth2_scheme), unit_of_work: UnitOfWork = Depends(get_unit_of_work)) -> UserSnapshot:
+    user = await verify_access_token(token, unit_of_work)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
+
+# Equivalent to @PreAuthorize("hasRole('ADMIN')")
+async def require_admin(current_user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
+    if (current_user.role or "").upper() != ADMIN_ROLE:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
+    return current_user
@@ -0,0 +1,108 @@
+"""
+Production entry point (the dev server is still `uvicorn main:app --reload`):
+
+    python -m src.server                 # one worker per CPU on 0.0.0.0:8000
+    python -m src.server --workers 4 --port 8080
+
+Everything that has to happen once per deployment runs here, in the supervisor process,
+before any worker starts: Alembic migrations (or, with --no-migrate, a check that the schema
+is at head) and bcrypt calibration. Workers only import the app, so their cold start is the
+import time plus the lifespan. SIGTERM stops accepting connections, lets in-flight requests
+finish (up to GRACEFUL_SHUTDOWN_TIMEOUT seconds) and then runs the lifespan shutdown.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+from src.config import ROOT, settings
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    return Config(os.path.join(ROOT, "alembic.ini"))
+
+
+def migrate():
+    from alembic import command
+
+    command.upgrade(_alembic_config(), "head")
+
+
+def check_schema():
+    """Refuses to start workers against a database that is not at the latest migration."""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    from src.database import engine
+
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    # The supervisor keeps no connections open while workers run
+    engine.dispose()
+    if current != head:
+        raise SystemExit(f"Database schema is at revision {current}, expected {head}: run `alembic upgrade head`")
+
+
+def prepare_worker_environment(workers: int):
+    """Settings decided once here and inherited by every worker through the environment."""
+    from src.password_hasher import calibrate_bcrypt_rounds
+
+    # One calibration for all workers: the same cost everywhere, and no probe per worker
+    if settings.bcrypt_rounds == "auto":
+        os.environ["BCRYPT_ROUNDS"] = str(calibrate_bcrypt_rounds())
+    # Each worker has its own hashing pool; together they should not exceed the CPU count.
+    # A value set in the environment or .env is kept.
+    if "password_hash_workers" in settings.model_fields_set:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(settings.password_hash_workers)
+    else:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(max(1, (os.cpu_count() or 1) // workers))
+    # Migrations own the schema; workers skip create_all at startup
+    os.environ["DB_CREATE_ALL"] = "false"
+
+
+def _event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def _http_parser() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.server", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.web_concurrency or os.cpu_count() or 1)
+    parser.add_argument("--no-migrate", action="store_true", help="only check that the schema is at head")
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    import uvicorn
+
+    args = build_parser().parse_args(argv)
+    if not args.no_migrate:
+        migrate()
+    check_schema()
+    prepare_worker_environment(args.workers)
+
+    loop, http = _event_loop(), _http_parser()
+    print(f"Starting {args.workers} worker(s) on {args.host}:{args.port} (loop={loop}, http={http}, "
+          f"bcrypt rounds={os.environ.get('BCRYPT_ROUNDS', settings.bcrypt_rounds)})", file=sys.stderr)
+    uvicorn.run(
+        "main:app",
+        app_dir=ROOT,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from src.repositories.user_repository import AsyncUserRepository, UserRepository
+from src.streaming import STREAM_BATCH_SIZE, RowStream, decode_cursor, encode_cursor
+
+LEADERBOARD_COLUMNS = ("username", "score", "role", "rank")
+
+class LeaderboardService:
+    def __init__(self, db: Session):
+        self.user_repository = UserRepository(db)
+
+    def get_page(self, offset: int, limit: int) -> list[dict]:
+        rows = self.user_repository.find_ranked(offset, limit)
+        return [self._to_entry(row, offset + index + 1) for index, row in enumerate(rows)]
+
+    def get_around(self, username: str, limit: int) -> list[dict] | None:
+        """Page of `limit` entries centred on the given user, or None if the user does not exist."""
+        user = self.user_repository.find_by_username(username)
+        if user is None:
+            return None
+        position = self.user_repository.count_ranked_before(user.score, user.id)
+        return self.get_page(max(position - limit // 2, 0), limit)
+
+    def last_modified(self) -> datetime | None:
+        return self.user_repository.last_modified()
+
+    def award_points(self, user_id: int, points: int) -> None:
+        self.user_repository.add_score(user_id, points)
+
+    @staticmethod
+    def _to_entry(row, rank: int) -> dict:
+        return dict(zip(LEADERBOARD_COLUMNS, LeaderboardService._to_row(row, rank)))
+
+    @staticmethod
+    def _to_row(row, rank: int) -> tuple:
+        role = "Admin" if "admin" in row.username.lower() else "User"  # Simple role logic based on name
+        return row.username, row.score, role, rank
+
+
+class AsyncLeaderboardService:
+    def __init__(self, db: AsyncSession):
+        self.user_repository = AsyncUserRepository(db)
+
+    async def get_page(self, offset: int, limit: int) -> list[dict]:
+        rows = await self.user_repository.find_ranked(offset, limit)
+        return [LeaderboardService._to_entry(row, offset + index + 1) for index, row in enumerate(rows)]
+
+    async def get_around(self, username: str, limit: int) -> list[dict] | None:
+        user = await self.user_repository.find_by_username(username)
+        if user is None:
+            return None
+        position = await self.user_repository.count_ranked_before(user.score, user.id)
+        return await self.get_page(max(position - limit // 2, 0), limit)
+
+    async def stream(self, after: str | None, limit: int | None) -> RowStream:
+        """
+        The ranking from a keyset cursor on (see src/streaming.py), read with a server-side
+        cursor. Raises ValueError for a cursor this service did not issue.
+        """
+        key = decode_cursor(after, 2) if after is not None else None
+        # One rank count for the page; ranks then follow the stream
+        position = await self.user_repository.count_ranked_before(*key) + 1 if key is not None else 0
+        rows = self.user_repository.stream_ranked(key, limit + 1 if limit is not None else None, STREAM_BATCH_SIZE)
+        return RowStream(
+            LEADERBOARD_COLUMNS, rows, limit,
+            to_row=lambda row, served: LeaderboardService._to_row(row, position + served),
+            cursor_of=lambda row: encode_cursor(row.score, row.id),
+        )
+
+    async def last_modified(self) -> datetime | None:
+        return await self.user_repository.last_modified()
+
+    async def award_points(self, user_id: int, points: int) -> None:
+        await self.user_repository.add_score(user_id, points)
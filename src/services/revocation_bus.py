@@ -0,0 +1,161 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.logging_config import logger
+from src.repositories.revocation_repository import AsyncRevocationRepository
+from src.response_cache import response_cache
+from src.revocation import RevocationList, revocation_list
+from src.security import ACCESS_TOKEN_EXPIRE_MINUTES
+from src.token_cache import token_cache
+
+POLL_BATCH_SIZE = 1000
+PRUNE_INTERVAL_SECONDS = 60
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    # Naive UTC, matching how SQLite stores DateTime columns
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def _to_timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class BusStats:
+    def __init__(self):
+        self.published = 0
+        self.applied = 0
+        self.polls = 0
+        self.errors = 0
+
+    def snapshot(self) -> dict:
+        return {"published": self.published, "applied": self.applied, "polls": self.polls, "errors": self.errors}
+
+
+class RevocationBus:
+    """
+    Keeps every worker's RevocationList in step, with the revocation_events table as the channel.
+
+    A revocation is committed to the table, applied to this worker at once, and picked up by the
+    other workers on their next poll (an indexed `id > last seen` query every
+    REVOCATION_POLL_INTERVAL_MS). So logout takes effect immediately in the worker that served it
+    and within one poll interval everywhere else, and requests never query for it. At startup,
+    the events still in force are loaded before the first request. Events are deleted by the reaper once
+    every token they cover has expired.
+
+    Ids are allocated in commit order by SQLite's single writer. On a database with concurrent
+    writers, a poll could pass over an id that commits late; a shared pub/sub (e.g. Redis or
+    LISTEN/NOTIFY) would then be the better channel behind the same revoke_* methods.
+    """
+
+    def __init__(
+        self,
+        revocations: RevocationList = revocation_list,
+        session_factory=AsyncSessionLocal,
+        poll_interval_ms: float = settings.revocation_poll_interval_ms,
+        token_lifetime: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    ):
+        self.revocations = revocations
+        self.session_factory = session_factory
+        self.poll_interval_seconds = poll_interval_ms / 1000
+        self.token_lifetime_seconds = token_lifetime.total_seconds()
+        self.stats = BusStats()
+        self._last_id = 0
+        self._next_prune = 0.0
+        self._task: asyncio.Task | None = None
+
+    # --- Publishing ---
+    async def revoke_user(self, user_id: int) -> None:
+        """Invalidates every access token of the user issued until now (logout everywhere)."""
+        issued_before = time.time()
+        await self._publish(user_id, None, issued_before, issued_before + self.token_lifetime_seconds)
+
+    async def revoke_token(self, user_id: int | None, jti: str, expires_at: float) -> None:
+        """Invalidates one access token until its own expiry."""
+        await self._publish(user_id, jti, None, expires_at)
+
+    async def _publish(self, user_id: int | None, jti: str | None, issued_before: float | None, forget_at: float):
+        async with self.session_factory() as db:
+            await AsyncRevocationRepository(db).add(user_id, jti, issued_before, _to_datetime(forget_at))
+            await db.commit()
+        self.stats.published += 1
+        # This worker does not wait for its own poll (which will see the event again, harmlessly)
+        self._apply(user_id, jti, issued_before, forget_at)
+
+    def _apply(self, user_id: int | None, jti: str | None, issued_before: float | None, forget_at: float):
+        if issued_before is not None and user_id is not None:
+            self.revocations.revoke_user(user_id, issued_before, forget_at)
+        if jti is not None:
+            self.revocations.revoke_token(jti, forget_at)
+        if user_id is not None:
+            # Verified-token and per-user response cache entries must not outlive the revocation
+            token_cache.invalidate_user(user_id)
+            response_cache.invalidate_tags((f"user:{user_id}",))
+        self.stats.applied += 1
+
+    # --- Following other workers ---
+    async def load(self):
+        """Applies every event still in force and remembers where the log ends."""
+        async with self.session_factory() as db:
+            repository = AsyncRevocationRepository(db)
+            # Read the end first: events committed in between are applied twice, never skipped
+            last_id = await repository.last_id()
+            events = await repository.find_active(datetime.utcnow())
+        for event in events:
+            self._apply(event.user_id, event.jti, event.issued_before, _to_timestamp(event.expires_at))
+        self._last_id = max(last_id, self._last_id)
+
+    async def poll_once(self) -> int:
+        applied = 0
+        while True:
+            async with self.session_factory() as db:
+                repository = AsyncRevocationRepository(db)
+                events = await repository.find_after(self._last_id, POLL_BATCH_SIZE)
+                if not events and self._last_id and await repository.last_id() < self._last_id:
+                    # The log's end went backwards: ids were reused after the reaper emptied a table
+                    # created without AUTOINCREMENT (e.g. by create_all before it was added). Re-read it all;
+                    # applying an event twice is harmless.
+                    self._last_id = 0
+                    continue
+            for event in events:
+                self._apply(event.user_id, event.jti, event.issued_before, _to_timestamp(event.expires_at))
+                self._last_id = event.id
+            applied += len(events)
+            if len(events) < POLL_BATCH_SIZE:
+                break
+        self.stats.polls += 1
+        if time.monotonic() >= self._next_prune:
+            self.revocations.prune()
+            self._next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+        return applied
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats.errors += 1
+                logger.exception("Revocation poll failed")
+
+    async def start(self):
+        await self.load()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+revocation_bus = RevocationBus()
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.logging_config import logger
+from src.repositories.refresh_token_repository import AsyncRefreshTokenRepository
+from src.repositories.revocation_repository import AsyncRevocationRepository
+
+
+class ReaperStats:
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.batches = 0
+        self.expired_reaped = 0
+        self.revoked_reaped = 0
+        self.revocations_reaped = 0
+        self.batch_seconds_total = 0.0
+        self.batch_seconds_max = 0.0
+        self.last_batch_seconds = 0.0
+
+    def record_batch(self, seconds: float):
+        self.batches += 1
+        self.batch_seconds_total += seconds
+        self.batch_seconds_max = max(self.batch_seconds_max, seconds)
+        self.last_batch_seconds = seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "batches": self.batches,
+            "rows_reaped": self.expired_reaped + self.revoked_reaped + self.revocations_reaped,
+            "expired_reaped": self.expired_reaped,
+            "revoked_reaped": self.revoked_reaped,
+            "revocations_reaped": self.revocations_reaped,
+            "batch_seconds_total": self.batch_seconds_total,
+            "batch_seconds_max": self.batch_seconds_max,
+            "last_batch_seconds": self.last_batch_seconds,
+        }
+
+
+class RefreshTokenReaper:
+    """
+    Periodically deletes expired refresh tokens that were never revoked, revoked ones older than
+    the retention period (whether or not they have expired),
+    and access-token revocation events whose tokens have all expired.
+
+    Rows are removed in batches of at most `batch_size`, each in its own short transaction, so
+    the SQLite write lock is never held for long and login/refresh writes interleave freely.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        interval_seconds: float = settings.refresh_token_reaper_interval_seconds,
+        batch_size: int = settings.refresh_token_reaper_batch_size,
+        retention_days: float = settings.refresh_token_retention_days,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.retention = timedelta(days=retention_days)
+        self.stats = ReaperStats()
+        self._task: asyncio.Task | None = None
+
+    async def _delete_in_batches(self, method: str, threshold: datetime, repository=AsyncRefreshTokenRepository) -> int:
+        total = 0
+        while True:
+            started = time.perf_counter()
+            async with self.session_factory() as db:
+                deleted = await getattr(repository(db), method)(threshold, self.batch_size)
+                await db.commit()
+            self.stats.record_batch(time.perf_counter() - started)
+            total += deleted
+            if deleted < self.batch_size:
+                return total
+            await asyncio.sleep(0)  # let request handlers run between batches
+
+    async def reap_once(self) -> int:
+        now = datetime.utcnow()
+        expired = await self._delete_in_batches("delete_expired", now)
+        revoked = await self._delete_in_batches("delete_revoked_before", now - self.retention)
+        revocations = await self._delete_in_batches("delete_expired", now, AsyncRevocationRepository)
+        self.stats.runs += 1
+        self.stats.expired_reaped += expired
+        self.stats.revoked_reaped += revoked
+        self.stats.revocations_reaped += revocations
+        if expired or revoked or revocations:
+            logger.info("Refresh token reaper removed %d expired and %d revoked tokens, %d revocation events",
+                        expired, revoked, revocations)
+        return expired + revoked + revocations
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reap_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats.errors += 1
+                logger.exception("Refresh token reaper run failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+token_reaper = RefreshTokenReaper()
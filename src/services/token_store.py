@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+from datetime import datetime, timedelta
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.instrumentation import request_queries
+from src.repositories.refresh_token_repository import AsyncRefreshTokenRepository
+from src.security import REFRESH_TOKEN_EXPIRE_DAYS, create_refresh_token
+
+
+class _PendingWrite:
+    __slots__ = ("method", "args", "future")
+
+    def __init__(self, method: str, args: tuple, future: asyncio.Future):
+        self.method = method
+        self.args = args
+        self.future = future
+
+
+class RefreshTokenStore:
+    """
+    Write path for refresh tokens with group commit.
+
+    Issue, rotate and revoke calls are queued for up to TOKEN_WRITE_BATCH_WINDOW_MS and then
+    applied in a single transaction, so a burst of logins/refreshes costs one commit instead of
+    one (or, for rotation, two) per request. A rotation is always atomic: the old token is deleted
+    and the new one inserted in the same transaction, or neither happens.
+
+    Durability: a caller is only answered after the transaction holding its write has committed,
+    so an acknowledged token is exactly as durable as with per-request commits. If a batch fails
+    every caller in it gets the error and nothing in the batch is persisted. The only trade-off is
+    up to one window of extra latency. With SQLITE_PROFILE=performance (synchronous=NORMAL) the
+    most recent commits can still be rolled back by an OS crash or power loss, but not by an
+    application crash; affected users simply have to log in again.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        window_ms: float = settings.token_write_batch_window_ms,
+        max_batch: int = settings.token_write_batch_max,
+    ):
+        self.session_factory = session_factory
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: list[_PendingWrite] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _new_expiry() -> datetime:
+        # Naive UTC, matching how SQLite stores DateTime columns
+        return datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+    # --- Public API ---
+    async def issue(self, user_id: int) -> str:
+        token = create_refresh_token()
+        await self._submit("add", token, user_id, self._new_expiry())
+        return token
+
+    async def rotate(self, old_token: str, user_id: int) -> str | None:
+        """Returns the replacement token, or None if the old one was concurrently used or revoked."""
+        new_token = create_refresh_token()
+        rotated = await self._submit("rotate", old_token, new_token, user_id, self._new_expiry())
+        return new_token if rotated else None
+
+    async def revoke(self, token: str) -> int | None:
+        return await self._submit("revoke", token)
+
+    async def revoke_all(self, user_id: int) -> int:
+        return await self._submit("revoke_all_for_user", user_id)
+
+    async def flush(self):
+        """Commits whatever is queued and waits for in-flight batches (used on shutdown)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending:
+            await self._commit_batch(self._take_batch())
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    # --- Batching ---
+    async def _submit(self, method: str, *args):
+        if self.window_seconds <= 0:
+            async with self.session_factory() as db:
+                result = await getattr(AsyncRefreshTokenRepository(db), method)(*args)
+                await db.commit()
+                return result
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # New event loop (e.g. a fresh test client): forget state tied to the old one
+            self._loop = loop
+            self._pending = []
+            self._flush_handle = None
+            self._in_flight = set()
+
+        future = loop.create_future()
+        self._pending.append(_PendingWrite(method, args, future))
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._schedule_flush)
+        return await future
+
+    def _take_batch(self) -> list[_PendingWrite]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        # The batch serves many requests: its statements must not count towards the one that flushed it
+        context = contextvars.copy_context()
+        context.run(request_queries.set, None)
+        task = asyncio.get_running_loop().create_task(self._commit_batch(self._take_batch()), context=context)
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _commit_batch(self, batch: list[_PendingWrite]):
+        results = []
+        try:
+            async with self.session_factory() as db:
+                repository = AsyncRefreshTokenRepository(db)
+                for pending in batch:
+                    results.append(await getattr(repository, pending.method)(*pending.args))
+                await db.commit()
+        except Exception as exc:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+            return
+        for pending, result in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+
+token_store = RefreshTokenStore()
@@ -1,9 +1,51 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+from fastapi import BackgroundTasks
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.repositories.user_repository import UserRepository
+from src.database import AsyncSessionLocal
+from src.repositories.user_repository import AsyncUserRepository, UserRepository
 from src.models.user import User
-from src.security import get_password_hash, verify_password
+from src.schemas import UserCreate
+from src.security import get_password_hash, get_password_hash_async, verify_password, verify_password_async
+from src.config import settings
+from src.password_hasher import PasswordHasher, PasswordHasherBusy, hash_settings, password_hasher
+from src.logging_config import logger
+from src.streaming import STREAM_BATCH_SIZE, RowStream, decode_cursor, encode_cursor
 from typing import Optional
 
+# Listed/exported user fields (never the password hash)
+USER_COLUMNS = ("id", "username", "email", "role", "score", "updated_at")
+
+def _user_row(row) -> tuple:
+    return row.id, row.username, row.email, row.role, row.score, row.updated_at.isoformat() if row.updated_at else None
+
+class UserAlreadyExistsError(Exception):
+    """Raised when the email or username (compared case-insensitively) is already registered."""
+
+# Unique email/username columns and indexes, as SQLite ("UNIQUE constraint failed: users.email_key")
+# and PostgreSQL ('violates unique constraint "ix_users_email_key"') name them
+_DUPLICATE_FIELD = re.compile(r"\b(?:users\.|ix_users_)(email|username)(?:_key)?\b")
+_DUPLICATE_MESSAGES = {"email": "Email already registered", "username": "Username already taken"}
+
+def _already_exists(exc: IntegrityError) -> UserAlreadyExistsError | None:
+    """The UserAlreadyExistsError for a duplicate email/username, None for any other violation."""
+    message = str(exc.orig)
+    match = _DUPLICATE_FIELD.search(message)
+    if match is None or not ("unique" in message.lower() or "duplicate" in message.lower()):
+        return None
+    return UserAlreadyExistsError(_DUPLICATE_MESSAGES[match.group(1)])
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+
 class UserService:
     def __init__(self, db: Session):
         self.user_repository = UserRepository(db)
@@ -11,7 +53,13 @@ class UserService:
     def create_user(self, username: str, email: str, password: str) -> User:
         hashed_password = get_password_hash(password)
         new_user = User(username=username, email=email, password=hashed_password)
-        return self.user_repository.save(new_user)
+        try:
+            return self.user_repository.save(new_user)
+        except IntegrityError as exc:
+            error = _already_exists(exc)
+            if error is None:
+                raise
+            raise error from exc
 
     def authenticate_user(self, identifier: str, password: str) -> Optional[User]:
         # 1. Search DB for user by email OR username
@@ -27,4 +75,138 @@ class UserService:
             return None
             
         # 5. Only return the user object if the password matches
-        return user
\ No newline at end of file
+        return user
+
+    def import_users(
+        self,
+        records: Iterable[tuple[int, dict]],
+        batch_size: int = 1000,
+        hasher: PasswordHasher = password_hasher,
+        on_invalid: Callable[[int, str], None] | None = None,
+        on_batch: Callable[[ImportReport], None] | None = None,
+    ) -> ImportReport:
+        """
+        Bulk variant of create_user for (line number, record) pairs.
+
+        Records go through the same UserCreate validation as /auth/register. Each batch is
+        hashed across the hashing pool and inserted with one executemany in one transaction.
+        Emails/usernames already taken are counted as duplicates instead of failing the batch.
+        """
+        report = ImportReport()
+        batch: list[UserCreate] = []
+
+        def flush():
+            hashed = hasher.hash_many([user.password for user in batch])
+            inserted = self.user_repository.insert_many([
+                {"username": user.username, "email": user.email, "password": password}
+                for user, password in zip(batch, hashed)
+            ])
+            report.inserted += inserted
+            report.duplicates += len(batch) - inserted
+            batch.clear()
+            if on_batch:
+                on_batch(report)
+
+        for line, record in records:
+            report.read += 1
+            try:
+                batch.append(UserCreate.model_validate(record))
+            except ValidationError as exc:
+                report.invalid += 1
+                if on_invalid:
+                    on_invalid(line, "; ".join(error["msg"] for error in exc.errors()))
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        return report
+
+    def export_users(self, batch_size: int = 1000) -> Iterator[dict]:
+        """Every user as a dict (no password hashes), streamed with constant memory."""
+        for row in self.user_repository.stream_all(batch_size):
+            yield dict(zip(USER_COLUMNS, _user_row(row)))
+
+
+# Async variant used by the HTTP layer; bcrypt is awaited on the hashing pool
+class AsyncUserService:
+    def __init__(self, db: AsyncSession):
+        self.user_repository = AsyncUserRepository(db)
+
+    def list_users(self, after: str | None, limit: int | None) -> RowStream:
+        """Users in id order from a keyset cursor on; raises ValueError for a malformed cursor."""
+        after_id = decode_cursor(after, 1)[0] if after is not None else None
+        rows = self.user_repository.stream_all(STREAM_BATCH_SIZE, after_id, limit + 1 if limit is not None else None)
+        return RowStream(USER_COLUMNS, rows, limit, to_row=lambda row, served: _user_row(row),
+                         cursor_of=lambda row: encode_cursor(row.id))
+
+    # Insert-and-catch: the unique indexes decide, so there is no check-then-insert race
+    async def create_user(self, username: str, email: str, password: str) -> User:
+        hashed_password = await get_password_hash_async(password)
+        new_user = User(username=username, email=email, password=hashed_password)
+        try:
+            return await self.user_repository.save(new_user)
+        except IntegrityError as exc:
+            error = _already_exists(exc)
+            if error is None:
+                raise
+            raise error from exc
+
+    async def authenticate_user(self, identifier: str, password: str,
+                                background_tasks: BackgroundTasks | None = None) -> Optional[User]:
+        user = await self.user_repository.find_by_identifier(identifier)
+        if not user:
+            return None
+        if not await verify_password_async(password, user.password):
+            return None
+        # The plain password is only known now: upgrade an outdated hash after the response is sent
+        if background_tasks is not None and settings.password_rehash_on_login and password_hasher.needs_update(user.password):
+            background_tasks.add_task(upgrade_password_hash, user.id, user.password, password)
+        return user
+
+    async def password_hash_report(self) -> dict:
+        """How many users have each hash scheme/cost, and which of those get upgraded on login."""
+        counts: dict[str, int] = {}
+        async for password_hash in self.user_repository.stream_password_hashes():
+            parameters = hash_settings(password_hash or "")
+            counts[parameters] = counts.get(parameters, 0) + 1
+        policy = password_hasher.policy
+        return {
+            "policy": {
+                "scheme": policy.scheme,
+                "bcrypt_rounds": policy.bcrypt_rounds,
+                "bcrypt_rounds_calibrated": policy.calibrated,
+                "argon2_time_cost": policy.argon2_time_cost,
+                "argon2_memory_cost_kb": policy.argon2_memory_cost_kb,
+                "argon2_parallelism": policy.argon2_parallelism,
+            },
+            "total": sum(counts.values()),
+            "parameters": [
+                {
+                    "settings": parameters,
+                    "users": users,
+                    # Only the settings part matters; pad it to a parseable hash of that kind
+                    "needs_update": parameters == "unknown" or password_hasher.needs_update(_sample_hash(parameters)),
+                }
+                for parameters, users in sorted(counts.items(), key=lambda item: -item[1])
+            ],
+        }
+
+
+def _sample_hash(parameters: str) -> str:
+    if parameters.startswith("$2"):
+        return parameters + "$" + "." * 53
+    return parameters + "$" + "A" * 22 + "$" + "A" * 43
+
+
+async def upgrade_password_hash(user_id: int, old_hash: str, password: str, session_factory=AsyncSessionLocal):
+    """Background task: re-hash with the current policy unless the hash changed meanwhile."""
+    try:
+        new_hash = await get_password_hash_async(password)
+    except PasswordHasherBusy:
+        return  # Busy: retried on the next login
+    async with session_factory() as db:
+        upgraded = await AsyncUserRepository(db).replace_password_hash(user_id, old_hash, new_hash)
+    if upgraded:
+        password_hasher.metrics.record_rehash()
+        logger.info("Upgraded password hash for user ID %s: %s -> %s", user_id, hash_settings(old_hash), hash_settings(new_hash))
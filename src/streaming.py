@@ -0,0 +1,120 @@
+import base64
+from typing import Any, AsyncGenerator, AsyncIterator, Callable
+
+from fastapi.responses import StreamingResponse
+
+from src.responses import dumps
+
+# Rows fetched per round trip (yield_per) and encoded per body chunk
+STREAM_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson", "columnar": "application/x-ndjson"}
+
+
+def encode_cursor(*values: int) -> str:
+    """Opaque keyset cursor: the sort key of the last row a client has seen."""
+    return base64.urlsafe_b64encode(":".join(map(str, values)).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, arity: int) -> tuple[int, ...]:
+    """Inverse of encode_cursor; raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        values = tuple(int(value) for value in raw.split(":"))
+    except (ValueError, UnicodeDecodeError) as error:
+        raise ValueError("Malformed cursor") from error
+    if len(values) != arity:
+        raise ValueError("Malformed cursor")
+    return values
+
+
+class RowStream:
+    """
+    One page of a keyset-paginated listing, iterated as tuples in `columns` order.
+
+    `rows` must be fetched with limit + 1: the extra row only tells whether another page
+    exists, in which case `next_cursor` (the cursor of the last row served) is set once the
+    iteration is over. It stays None on the last page or when there is no limit.
+    """
+
+    def __init__(self, columns: tuple[str, ...], rows: AsyncGenerator[Any, None], limit: int | None,
+                 to_row: Callable[[Any, int], tuple], cursor_of: Callable[[Any], str]):
+        self.columns = columns
+        self.next_cursor: str | None = None
+        self._rows = rows
+        self._limit = limit
+        self._to_row = to_row
+        self._cursor_of = cursor_of
+
+    async def __aiter__(self) -> AsyncIterator[tuple]:
+        served, last = 0, None
+        async for row in self._rows:
+            if served == self._limit:
+                self.next_cursor = self._cursor_of(last)
+                await self._rows.aclose()
+                break
+            served += 1
+            last = row
+            yield self._to_row(row, served)
+
+
+async def _chunks(stream: RowStream, encode: Callable[[list[tuple]], bytes]) -> AsyncIterator[bytes]:
+    batch: list[tuple] = []
+    async for row in stream:
+        batch.append(row)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield encode(batch)
+            batch = []
+    if batch:
+        yield encode(batch)
+
+
+async def _json(stream: RowStream) -> AsyncIterator[bytes]:
+    # {"items": [...], "next": cursor}: the cursor is known last, so it comes after the items
+    columns, first = stream.columns, True
+
+    def encode(batch: list[tuple]) -> bytes:
+        nonlocal first
+        # One encoder call per batch; the array's brackets are dropped to splice it into items
+        body = dumps([dict(zip(columns, row)) for row in batch])[1:-1]
+        if first:
+            first = False
+            return body
+        return b"," + body
+
+    yield b'{"items":['
+    async for chunk in _chunks(stream, encode):
+        yield chunk
+    yield b'],"next":' + dumps(stream.next_cursor) + b"}"
+
+
+async def _ndjson(stream: RowStream) -> AsyncIterator[bytes]:
+    columns = stream.columns
+    async for chunk in _chunks(stream, lambda batch: b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in batch)):
+        yield chunk
+    yield dumps({"next": stream.next_cursor}) + b"\n"
+
+
+async def _columnar(stream: RowStream) -> AsyncIterator[bytes]:
+    # Header line, then one line per batch with a list of values per column (no repeated keys)
+    yield dumps({"columns": list(stream.columns)}) + b"\n"
+    async for chunk in _chunks(stream, lambda batch: dumps([list(column) for column in zip(*batch)]) + b"\n"):
+        yield chunk
+    yield dumps({"next": stream.next_cursor}) + b"\n"
+
+
+ENCODERS = {"json": _json, "ndjson": _ndjson, "columnar": _columnar}
+
+
+def stream_response(stream: RowStream, output_format: str) -> StreamingResponse:
+    """
+    Streams the rows in constant memory, encoded as:
+
+        json      {"items": [{column: value, ...}, ...], "next": cursor}
+        ndjson    one {column: value, ...} per line, then {"next": cursor}
+        columnar  {"columns": [...]}, then [[values of column 1], [values of column 2], ...] per batch of rows,
+                  then {"next": cursor}
+
+    Pass `next` back as `after` to continue; it is null on the last page.
+    """
+    return StreamingResponse(ENCODERS[output_format](stream), media_type=MEDIA_TYPES[output_format])
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.config import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of the user fields request handlers need (never the password hash)."""
+    id: int
+    username: str
+    email: str
+    role: str | None = None
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(id=user.id, username=user.username, email=user.email, role=user.role)
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    claims: dict
+    user: UserSnapshot
+    expires_at: float
+
+
+def _digest(token: str) -> bytes:
+    # Raw bearer tokens are never kept in memory as keys
+    return hashlib.sha256(token.encode()).digest()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that already passed signature verification and user lookup.
+
+    Entries expire at the earliest of the token's own `exp` and the configured TTL.
+    """
+
+    def __init__(self, max_entries: int = settings.token_cache_max_entries, ttl_seconds: float = settings.token_cache_ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, CachedToken] = OrderedDict()
+        self._keys_by_user: dict[int, set[bytes]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> CachedToken | None:
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, token: str, claims: dict, user: UserSnapshot):
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        key = _digest(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = CachedToken(claims=claims, user=user, expires_at=expires_at)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            self._remove(_digest(token))
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key: bytes):
+        # Caller must hold the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry.user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry.user.id]
+
+
+token_cache = VerifiedTokenCache()
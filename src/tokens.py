@@ -0,0 +1,293 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+
+from src.config import settings
+
+# Without JWT_KEYS the keyring holds a single HMAC key, kid "default", built from SECRET_KEY/ALGORITHM.
+# JWT_KEYS is a JSON list of keys, e.g.
+#   [{"kid": "2026-10", "alg": "EdDSA", "private_key_file": "keys/2026-10.pem"},
+#    {"kid": "default", "alg": "HS256", "secret": "<previous SECRET_KEY>"}]
+# HMAC keys take "secret"; ES256/EdDSA keys take a PEM in "private_key(_file)" (can sign) or
+# "public_key(_file)" (verify only). Tokens without a kid header are checked with kid "default".
+# JWT_ACTIVE_KID picks the signing key (default: the first key that can sign).
+
+DEFAULT_KID = "default"
+HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+class TokenError(Exception):
+    """Token is malformed, signed with an unknown key, has a bad signature or is expired."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (ValueError, TypeError) as exc:
+        raise TokenError("Invalid base64 segment") from exc
+
+
+class Key:
+    """
+    One keyring entry. Key material is parsed once here: HMAC keys keep a keyed hash object
+    whose inner/outer pads are already computed (each token only pays for .copy()), and
+    asymmetric keys are loaded into cryptography key objects. `cryptography` is only imported
+    for asymmetric keys, so the default HS256 setup never loads it.
+    """
+
+    def __init__(self, kid: str, alg: str, secret: str | None = None,
+                 private_key_pem: bytes | None = None, public_key_pem: bytes | None = None):
+        self.kid = kid
+        self.alg = alg
+        self.private_key = None
+        self.public_key = None
+        self._hmac = None
+        if alg in HMAC_DIGESTS:
+            if not secret:
+                raise ValueError(f"JWT key {kid!r}: {alg} needs a secret")
+            self.secret = secret
+            self._hmac = hmac.new(secret.encode("utf-8"), digestmod=HMAC_DIGESTS[alg])
+        elif alg in ("ES256", "EdDSA"):
+            from cryptography.hazmat.primitives import serialization
+            from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+            if private_key_pem:
+                self.private_key = serialization.load_pem_private_key(private_key_pem, password=None)
+                self.public_key = self.private_key.public_key()
+            elif public_key_pem:
+                self.public_key = serialization.load_pem_public_key(public_key_pem)
+            else:
+                raise ValueError(f"JWT key {kid!r}: {alg} needs a private or public key")
+            expected = ec.EllipticCurvePublicKey if alg == "ES256" else ed25519.Ed25519PublicKey
+            if not isinstance(self.public_key, expected) or (
+                alg == "ES256" and not isinstance(self.public_key.curve, ec.SECP256R1)
+            ):
+                raise ValueError(f"JWT key {kid!r}: key type does not match {alg}")
+        else:
+            raise ValueError(f"JWT key {kid!r}: unsupported algorithm {alg}")
+
+    @property
+    def can_sign(self) -> bool:
+        return self._hmac is not None or self.private_key is not None
+
+    # --- Native signing primitives ---
+    def sign(self, data: bytes) -> bytes:
+        if self._hmac is not None:
+            mac = self._hmac.copy()
+            mac.update(data)
+            return mac.digest()
+        if self.alg == "EdDSA":
+            return self.private_key.sign(data)
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+        # JWS wants the raw 64-byte r||s form, not DER
+        r, s = decode_dss_signature(self.private_key.sign(data, ec.ECDSA(hashes.SHA256())))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def verify(self, data: bytes, signature: bytes) -> bool:
+        if self._hmac is not None:
+            mac = self._hmac.copy()
+            mac.update(data)
+            return hmac.compare_digest(mac.digest(), signature)
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
+        try:
+            if self.alg == "EdDSA":
+                self.public_key.verify(signature, data)
+            else:
+                if len(signature) != 64:
+                    return False
+                der = encode_dss_signature(int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big"))
+                self.public_key.verify(der, data, ec.ECDSA(hashes.SHA256()))
+        except InvalidSignature:
+            return False
+        return True
+
+    # --- Key material in the forms python-jose expects ---
+    def jose_signing_key(self):
+        if self._hmac is not None:
+            return self.secret
+        from cryptography.hazmat.primitives import serialization
+
+        return self.private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode("ascii")
+
+    def jose_verification_key(self):
+        if self._hmac is not None:
+            return self.secret
+        from cryptography.hazmat.primitives import serialization
+
+        return self.public_key.public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("ascii")
+
+    def public_jwk(self) -> dict | None:
+        """RFC 7517 representation of the public half; None for shared-secret keys."""
+        if self.public_key is None:
+            return None
+        from cryptography.hazmat.primitives import serialization
+
+        if self.alg == "EdDSA":
+            raw = self.public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            return {"kty": "OKP", "crv": "Ed25519", "x": _b64encode(raw), "kid": self.kid, "alg": self.alg, "use": "sig"}
+        numbers = self.public_key.public_numbers()
+        return {
+            "kty": "EC", "crv": "P-256",
+            "x": _b64encode(numbers.x.to_bytes(32, "big")), "y": _b64encode(numbers.y.to_bytes(32, "big")),
+            "kid": self.kid, "alg": self.alg, "use": "sig",
+        }
+
+
+class Keyring:
+    def __init__(self, keys: list[Key], active_kid: str | None = None):
+        if not keys:
+            raise ValueError("JWT keyring is empty")
+        self.keys = {key.kid: key for key in keys}
+        if active_kid is None:
+            active_kid = next((key.kid for key in keys if key.can_sign), None)
+        if active_kid not in self.keys or not self.keys[active_kid].can_sign:
+            raise ValueError(f"JWT signing key {active_kid!r} is missing or verify-only")
+        self.active = self.keys[active_kid]
+
+    def get(self, kid: str | None) -> Key:
+        key = self.keys.get(kid or DEFAULT_KID)
+        if key is None:
+            raise TokenError("Unknown signing key")
+        return key
+
+
+def _read_pem(entry: dict, name: str) -> bytes | None:
+    if entry.get(name):
+        return entry[name].encode("ascii")
+    if entry.get(f"{name}_file"):
+        with open(entry[f"{name}_file"], "rb") as pem:
+            return pem.read()
+    return None
+
+
+def load_keyring() -> Keyring:
+    if not settings.jwt_keys:
+        return Keyring([Key(DEFAULT_KID, settings.algorithm, secret=settings.secret_key)])
+    keys = [
+        Key(
+            entry["kid"], entry["alg"], secret=entry.get("secret"),
+            private_key_pem=_read_pem(entry, "private_key"), public_key_pem=_read_pem(entry, "public_key"),
+        )
+        for entry in json.loads(settings.jwt_keys)
+    ]
+    return Keyring(keys, settings.jwt_active_kid)
+
+
+# --- Backends (same interface: encode(claims, key) -> str, decode(token, keyring) -> claims) ---
+class NativeBackend:
+    """HMAC via hashlib/hmac and ES256/EdDSA via cryptography, with all key parsing done upfront."""
+
+    def encode(self, claims: dict, key: Key) -> str:
+        header = {"alg": key.alg, "typ": "JWT", "kid": key.kid}
+        signing_input = (
+            _b64encode(json.dumps(header, separators=(",", ":")).encode("utf-8")) + "."
+            + _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        )
+        return signing_input + "." + _b64encode(key.sign(signing_input.encode("ascii")))
+
+    def decode(self, token: str, keyring: Keyring) -> dict:
+        try:
+            signing_input, signature = token.rsplit(".", 1)
+            header_segment, payload_segment = signing_input.split(".")
+            signed = signing_input.encode("ascii")
+            header = json.loads(_b64decode(header_segment))
+        except ValueError as exc:
+            raise TokenError("Malformed token") from exc
+        if not isinstance(header, dict) or not isinstance(header.get("kid", ""), str):
+            raise TokenError("Malformed token")
+        key = keyring.get(header.get("kid"))
+        # The key decides the algorithm; the header must agree (no alg confusion, no "none")
+        if header.get("alg") != key.alg:
+            raise TokenError("Algorithm mismatch")
+        if not key.verify(signed, _b64decode(signature)):
+            raise TokenError("Signature verification failed")
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except ValueError as exc:
+            raise TokenError("Malformed token") from exc
+        if not isinstance(claims, dict):
+            raise TokenError("Malformed token")
+        _validate_times(claims)
+        return claims
+
+
+class JoseBackend:
+    """The original python-jose path (no EdDSA support)."""
+
+    def __init__(self):
+        from jose import jwt
+
+        self._jwt = jwt
+
+    def encode(self, claims: dict, key: Key) -> str:
+        return self._jwt.encode(claims, key.jose_signing_key(), algorithm=key.alg, headers={"kid": key.kid})
+
+    def decode(self, token: str, keyring: Keyring) -> dict:
+        from jose import JWTError
+
+        try:
+            kid = self._jwt.get_unverified_header(token).get("kid", "")
+            if not isinstance(kid, str):
+                raise TokenError("Malformed token")
+            key = keyring.get(kid)
+            return self._jwt.decode(token, key.jose_verification_key(), algorithms=[key.alg])
+        except JWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+
+def _validate_times(claims: dict):
+    now = time.time()
+    for name in TIME_CLAIMS:
+        if name in claims and not isinstance(claims[name], (int, float)):
+            raise TokenError(f"Invalid {name} claim")
+    if "exp" in claims and now >= claims["exp"]:
+        raise TokenError("Signature has expired")
+    if "nbf" in claims and now < claims["nbf"]:
+        raise TokenError("The token is not yet valid")
+
+
+BACKENDS = {"native": NativeBackend, "jose": JoseBackend}
+
+
+class TokenCodec:
+    """Signs with the keyring's active key and verifies with whichever key the token's kid names."""
+
+    def __init__(self, keyring: Keyring, backend=None):
+        self.keyring = keyring
+        self.backend = backend or NativeBackend()
+
+    def encode(self, claims: dict) -> str:
+        claims = {
+            name: int(value.timestamp()) if name in TIME_CLAIMS and isinstance(value, datetime) else value
+            for name, value in claims.items()
+        }
+        return self.backend.encode(claims, self.keyring.active)
+
+    def decode(self, token: str) -> dict:
+        return self.backend.decode(token, self.keyring)
+
+    def jwks(self) -> dict:
+        """Public keys for local verification by other services (shared secrets are never listed)."""
+        return {"keys": [jwk for jwk in (key.public_jwk() for key in self.keyring.keys.values()) if jwk]}
+
+
+token_codec = TokenCodec(load_keyring(), BACKENDS[settings.jwt_backend]())
@@ -0,0 +1,91 @@
+import logging
+import reprlib
+import threading
+import time
+
+from src.config import settings
+from src.logging_config import logger
+
+# Errors per request that make up its signature; the rest only add to the count
+SIGNATURE_ERRORS = 5
+
+
+class ValidationErrorLog:
+    """
+    Sampled logging of 422s, so a flood of malformed requests costs a counter increment each
+    rather than a log record (and its formatting and I/O).
+
+    Requests are grouped by signature: method, route template and the (location, type) of
+    their first errors. The first request of a signature in each window of `window_seconds` is
+    logged. The others are counted and summarized in the next record of the same signature.
+    At most `max_signatures` are tracked; past that, new signatures are counted but not logged
+    until the window rolls over. The request body is only rendered at DEBUG, capped at
+    `body_max_bytes`.
+    """
+
+    def __init__(self, window_seconds: float = settings.validation_log_window_seconds,
+                 max_signatures: int = settings.validation_log_max_signatures,
+                 body_max_bytes: int = settings.validation_log_body_max_bytes):
+        self.window_seconds = window_seconds
+        self.max_signatures = max_signatures
+        self.body_max_bytes = body_max_bytes
+        self.total = 0
+        self.logged = 0
+        self.suppressed = 0
+        self._window_started = time.monotonic()
+        self._seen: dict[tuple, int] = {}  # signature -> requests suppressed in this window
+        self._previous: dict[tuple, int] = {}  # the same for the last window, until each signature reports it
+        # Parsed JSON bodies are rendered with bounded depth and width, never repr'd whole
+        self._repr = reprlib.Repr()
+        self._repr.maxlevel = 4
+        self._repr.maxdict = self._repr.maxlist = self._repr.maxtuple = self._repr.maxset = 20
+        self._repr.maxstring = self._repr.maxother = body_max_bytes
+        self._lock = threading.Lock()
+
+    def _admit(self, signature: tuple) -> int | None:
+        """None if the request should not be logged, else how many like it were suppressed before it."""
+        with self._lock:
+            self.total += 1
+            now = time.monotonic()
+            if now - self._window_started >= self.window_seconds:
+                self._window_started = now
+                self._previous = self._seen
+                self._seen = {}
+            if signature in self._seen:
+                self._seen[signature] += 1
+                self.suppressed += 1
+                return None
+            if len(self._seen) >= self.max_signatures:
+                self.suppressed += 1
+                return None
+            self._seen[signature] = 0
+            self.logged += 1
+            # Each signature reports its own count from the last window on its first record in this one
+            return self._previous.pop(signature, 0)
+
+    def _render_body(self, body) -> str:
+        if isinstance(body, (bytes, bytearray, str)):
+            return repr(body[:self.body_max_bytes])
+        return self._repr.repr(body)[:self.body_max_bytes]
+
+    def record(self, scope: dict, errors: list[dict], body=None):
+        route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+        signature = (scope.get("method"), route) + tuple(
+            (tuple(error.get("loc", ())), error.get("type")) for error in errors[:SIGNATURE_ERRORS]
+        )
+        suppressed = self._admit(signature)
+        if suppressed is None:
+            return
+        logger.warning(
+            "Validation error on %s %s (%d errors; %d similar requests not logged in the previous window): %s",
+            scope.get("method"), route, len(errors), suppressed,
+            [{"loc": error.get("loc"), "type": error.get("type"), "msg": error.get("msg")} for error in errors[:SIGNATURE_ERRORS]],
+        )
+        if body is not None and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Request body (truncated to %d bytes): %s", self.body_max_bytes, self._render_body(body))
+
+    def snapshot(self) -> dict:
+        return {"total": self.total, "logged": self.logged, "suppressed": self.suppressed}
+
+
+validation_error_log = ValidationErrorLog()
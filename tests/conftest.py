@@ -0,0 +1,33 @@
+"""
+The environment every test runs in: a temporary directory for the databases and logs, cheap
+password hashing and no background loops.
+
+The app reads its settings once, when src.config is first imported, so test modules import
+app code inside fixtures and tests, never at module level: collection then cannot build the
+settings (or open ./app.db) before this environment is in place, whatever the module order.
+The environment is restored when the session ends.
+"""
+import os
+
+import pytest
+
+TEST_ENVIRONMENT = {
+    "LOG_LEVEL": "WARNING",
+    "RATELIMIT_ENABLED": "false",
+    "REFRESH_TOKEN_REAPER_ENABLED": "false",
+    "PASSWORD_HASH_WORKERS": "0",
+    "BCRYPT_ROUNDS": "4",
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_environment(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("app")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(workdir)
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'app.db')}")
+        monkeypatch.setenv("RATE_LIMIT_STORAGE_URI", f"sqlite:///{os.path.join(workdir, 'ratelimit.db')}")
+        monkeypatch.setenv("LOG_FILE", os.path.join(workdir, "logs", "app.log"))
+        for key, value in TEST_ENVIRONMENT.items():
+            monkeypatch.setenv(key, value)
+        yield workdir
@@ -0,0 +1,25 @@
+import sqlite3
+import time
+
+
+def test_locked_storage_fails_open_within_the_busy_timeout(tmp_path):
+    from src.limiter_storage import SQLiteStorage
+
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'ratelimit.db'}")
+    assert storage.acquire_sliding_window_entry("ip:1", limit=1, expiry=60)
+    assert not storage.acquire_sliding_window_entry("ip:1", limit=1, expiry=60)
+
+    # Another worker holds the write lock
+    other = sqlite3.connect(tmp_path / "ratelimit.db", isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        assert storage.acquire_sliding_window_entry("ip:1", limit=1, expiry=60)
+        assert storage.incr("fixed", expiry=60) == 0
+        assert time.perf_counter() - started < 1
+        assert storage.contended == 2
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    assert not storage.acquire_sliding_window_entry("ip:1", limit=1, expiry=60)
@@ -0,0 +1,109 @@
+"""
+Statements and pool checkouts per request on the hot paths, as budgeted in benchmarks/harness.py.
+
+A change that adds a query to one of these paths (an eager session, a re-query, a lazy load)
+fails here rather than only showing up as a slower benchmark.
+"""
+import itertools
+
+import pytest
+from sqlalchemy import event
+
+PASSWORD = "query-counts-password"
+ACCOUNTS = itertools.count(1)
+
+
+class QueryCounter:
+    """Statements and checkouts made under a request id, so the revocation poll is not counted."""
+
+    def __init__(self):
+        from src.database import async_engine, async_write_engine, engine
+        from src.logging_config import request_id_var
+
+        self.statements = 0
+        self.checkouts = 0
+        self._request_id = request_id_var
+        self._engines = list({id(e): e for e in (engine, async_engine.sync_engine, async_write_engine.sync_engine)}.values())
+
+    def attach(self):
+        for bound in self._engines:
+            event.listen(bound, "before_cursor_execute", self._on_execute)
+            event.listen(bound.pool, "checkout", self._on_checkout)
+
+    def detach(self):
+        for bound in self._engines:
+            event.remove(bound, "before_cursor_execute", self._on_execute)
+            event.remove(bound.pool, "checkout", self._on_checkout)
+
+    def _on_execute(self, *args):
+        if self._request_id.get() is not None:
+            self.statements += 1
+
+    def _on_checkout(self, *args):
+        if self._request_id.get() is not None:
+            self.checkouts += 1
+
+    def reset(self):
+        self.statements = 0
+        self.checkouts = 0
+
+
+@pytest.fixture(scope="module")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+    from src.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="module")
+def counter():
+    counter = QueryCounter()
+    counter.attach()
+    yield counter
+    counter.detach()
+
+
+@pytest.fixture
+def session(client):
+    """A fresh account, logged in: (access token, refresh token)."""
+    username = f"counted{next(ACCOUNTS)}"
+    response = client.post("/auth/register", json={"username": username, "email": f"{username}@example.com", "password": PASSWORD})
+    assert response.status_code == 201, response.text
+    response = client.post("/auth/login", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()["access_token"], response.cookies["refresh_token"]
+
+
+def test_agent_never_checks_out_a_connection(client, counter):
+    counter.reset()
+    response = client.get("/agent")
+    assert response.status_code == 200
+    assert (counter.statements, counter.checkouts) == (0, 0)
+
+
+def test_me_on_a_token_cache_miss_is_one_statement(client, counter, session):
+    from src.response_cache import response_cache
+    from src.token_cache import token_cache
+
+    access_token, _ = session
+    token_cache.clear()
+    response_cache.clear()
+    counter.reset()
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code == 200, response.text
+    assert counter.statements == 1
+    assert counter.checkouts == 1
+
+
+def test_refresh_is_three_statements(client, counter, session):
+    _, refresh_token = session
+    client.cookies.clear()
+    counter.reset()
+    response = client.post("/auth/refresh", headers={"Cookie": f"refresh_token={refresh_token}"})
+    assert response.status_code == 200, response.text
+    assert counter.statements == 3
@@ -0,0 +1,18 @@
+import pytest
+
+
+@pytest.fixture
+def middleware():
+    from src.middleware.security_headers import SecurityHeadersMiddleware
+
+    return SecurityHeadersMiddleware(app=None)
+
+
+@pytest.mark.parametrize("path", ["/docs", "/docs/", "/docs/oauth2-redirect", "/redoc"])
+def test_override_covers_the_path_and_below(middleware, path):
+    assert middleware._headers_for(path) is not middleware._default
+
+
+@pytest.mark.parametrize("path", ["/docsfoo", "/docs-evil", "/redocs", "/api/docs"])
+def test_override_stops_at_the_segment_boundary(middleware, path):
+    assert middleware._headers_for(path) is middleware._default
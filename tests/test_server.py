@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def launcher_settings(tmp_path, monkeypatch):
+    """Builds the launcher's settings from a .env file; the variables it exports are restored afterwards."""
+    from src import server
+    from src.config import Settings
+
+    for key in ("PASSWORD_HASH_WORKERS", "BCRYPT_ROUNDS", "DB_CREATE_ALL"):
+        monkeypatch.delenv(key, raising=False)
+
+    def load(dotenv: str):
+        env_file = tmp_path / ".env"
+        env_file.write_text(dotenv)
+        monkeypatch.setattr(server, "settings", Settings(_env_file=env_file))
+        return server
+
+    return load
+
+
+def test_password_hash_workers_from_dotenv_survives(launcher_settings):
+    server = launcher_settings("BCRYPT_ROUNDS=4\nPASSWORD_HASH_WORKERS=3\n")
+    server.prepare_worker_environment(workers=8)
+    assert os.environ["PASSWORD_HASH_WORKERS"] == "3"
+
+
+def test_password_hash_workers_defaults_to_a_share_of_the_cpus(launcher_settings):
+    server = launcher_settings("BCRYPT_ROUNDS=4\n")
+    server.prepare_worker_environment(workers=2)
+    assert os.environ["PASSWORD_HASH_WORKERS"] == str(max(1, (os.cpu_count() or 1) // 2))
+    assert os.environ["DB_CREATE_ALL"] == "false"
@@ -0,0 +1,36 @@
+import asyncio
+import contextlib
+
+
+def test_group_commit_is_not_charged_to_the_request_that_flushed_it(monkeypatch):
+    from src.instrumentation import request_queries
+    from src.services import token_store as module
+
+    seen = []
+
+    class Repository:
+        def __init__(self, db):
+            pass
+
+        async def revoke(self, token):
+            seen.append(request_queries.get())
+            return 1
+
+    @contextlib.asynccontextmanager
+    async def session_factory():
+        class Session:
+            async def commit(self):
+                pass
+        yield Session()
+
+    monkeypatch.setattr(module, "AsyncRefreshTokenRepository", Repository)
+    store = module.RefreshTokenStore(session_factory=session_factory, window_ms=1)
+
+    async def request():
+        counter = [0]
+        request_queries.set(counter)
+        assert await store.revoke("token") == 1
+        return counter
+
+    assert asyncio.run(request()) == [0]
+    assert seen == [None]
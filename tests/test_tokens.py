@@ -0,0 +1,28 @@
+import base64
+import json
+
+import pytest
+
+
+def _segment(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+@pytest.fixture(params=["native", "jose"])
+def codec(request):
+    from src.tokens import BACKENDS, DEFAULT_KID, Key, Keyring, TokenCodec
+
+    return TokenCodec(Keyring([Key(DEFAULT_KID, "HS256", secret="test-secret")]), BACKENDS[request.param]())
+
+
+def test_round_trip(codec):
+    assert codec.decode(codec.encode({"sub": "alice"}))["sub"] == "alice"
+
+
+@pytest.mark.parametrize("kid", [["main"], {"kid": "main"}, [], 1])
+def test_non_string_kid_is_an_invalid_token(codec, kid):
+    from src.tokens import TokenError
+
+    token = f"{_segment({'alg': 'HS256', 'typ': 'JWT', 'kid': kid})}.{_segment({'sub': 'alice'})}.c2ln"
+    with pytest.raises(TokenError):
+        codec.decode(token)